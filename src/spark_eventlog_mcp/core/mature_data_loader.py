@@ -4,12 +4,13 @@
 
 import asyncio
 import json
+from collections import deque
 import zipfile
 import tempfile
 import shutil
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 import aiofiles
 import httpx
 
@@ -19,26 +20,79 @@ logger = logging.getLogger("spark-eventlog-mcp")
 # boto3 导入处理
 try:
     import boto3
+    from botocore.config import Config as BotoConfig
     from botocore.exceptions import NoCredentialsError, ClientError
     BOTO3_AVAILABLE = True
 except ImportError:
     BOTO3_AVAILABLE = False
     boto3 = None
+    BotoConfig = None
     NoCredentialsError = Exception
     ClientError = Exception
 
-from ..models.mature_models import EventLogData
 from ..models.schemas import DataSource
 
+# 流式读取时每次读取的字节数
+_STREAM_CHUNK_SIZE = 1024 * 1024
+
+# S3 连接池大小（需不小于预取数，避免线程排队等待连接）
+_S3_MAX_POOL_CONNECTIONS = 64
+
+# 流式读取 S3 时提前发起 get_object 的文件数
+_S3_PREFETCH = 8
+
+
+def _split_s3_path(s3_path: str) -> Tuple[str, str]:
+    """将 s3://bucket/key 拆分为 (bucket, key)，仅做下标切片，不分配中间列表"""
+    start = 5 if s3_path[:5] == "s3://" else 0
+    slash = s3_path.find("/", start)
+    if slash == -1:
+        return s3_path[start:], ""
+    return s3_path[start:slash], s3_path[slash + 1:]
+
+
+def _close_s3_response(task: "asyncio.Future") -> None:
+    """关闭预取但未被消费的 get_object 响应体，请求失败时忽略"""
+    if not task.cancelled() and task.exception() is None:
+        task.result()['Body'].close()
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """将字节块流切分为非空行，跨块的半行会与下一块拼接"""
+    pending = b''
+    async for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
 class MatureDataLoader:
     """成熟的数据加载器"""
 
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
         self.s3_client = None
+        # 所有 URL 下载共享的 HTTP 客户端，首次使用时创建，复用连接池
+        self._http_client: Optional[httpx.AsyncClient] = None
         if BOTO3_AVAILABLE:
             self._init_s3_client()
 
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """获取共享的 HTTP 客户端，已关闭时重新创建"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(timeout=30.0)
+        return self._http_client
+
+    async def aclose(self):
+        """关闭共享的 HTTP 客户端"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
     def _init_s3_client(self):
         """初始化 S3 客户端 - 智能选择凭证来源"""
         try:
@@ -47,6 +101,13 @@ class MatureDataLoader:
             aws_secret_key = self.config.get("aws_secret_access_key")
             aws_region = self.config.get("aws_region")
 
+            # 整个进程共享同一个客户端：放大连接池供预取并发使用，保持长连接并启用自适应重试
+            boto_config = BotoConfig(
+                max_pool_connections=_S3_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+                retries={'mode': 'adaptive', 'max_attempts': 5}
+            )
+
             if aws_access_key and aws_secret_key:
                 # 使用环境变量配置的凭证
                 logger.info(f"使用环境变量配置的 AWS 凭证，区域: {aws_region}")
@@ -54,12 +115,13 @@ class MatureDataLoader:
                     's3',
                     aws_access_key_id=aws_access_key,
                     aws_secret_access_key=aws_secret_key,
-                    region_name=aws_region
+                    region_name=aws_region,
+                    config=boto_config
                 )
             else:
                 # 使用系统默认配置 (环境变量、~/.aws/credentials、IAM角色等)
                 logger.info("使用系统默认 AWS 配置")
-                self.s3_client = boto3.client('s3')
+                self.s3_client = boto3.client('s3', config=boto_config)
 
             # 测试连接
             self.s3_client.list_buckets()
@@ -69,16 +131,45 @@ class MatureDataLoader:
             logger.warning(f"⚠️  警告：无法初始化 S3 客户端，S3 功能将不可用。错误: {str(e)}")
             self.s3_client = None
 
-    async def load_from_s3(self, s3_path: str) -> List[EventLogData]:
+    async def open_stream(self, data_source: DataSource) -> Tuple[Dict[str, Any], Optional[AsyncIterator[bytes]]]:
         """
-        从 S3 路径加载 Event Log 数据
+        验证数据源并打开事件日志行流，验证与读取共用一次调用
 
         Args:
-            s3_path: S3 路径，如 s3://bucket/path/to/logs/
+            data_source: 数据源配置
 
         Returns:
-            List[EventLogData]: 解析后的事件日志数据列表
+            Tuple: (验证结果, 事件行异步迭代器)；验证失败时迭代器为 None
+        """
+        validation_result = await self.validate_data_source(data_source)
+        if not validation_result["is_valid"]:
+            return validation_result, None
+        return validation_result, self.iter_event_lines(data_source)
+
+    async def iter_event_lines(self, data_source: DataSource) -> AsyncIterator[bytes]:
+        """
+        按数据源类型流式产出事件日志行，下载与解析可以交替进行，无需在内存中保存完整日志
+
+        Args:
+            data_source: 数据源配置
+
+        Yields:
+            bytes: 单行事件 JSON
         """
+        if data_source.source_type == "s3":
+            lines = self.iter_from_s3(data_source.path)
+        elif data_source.source_type == "url":
+            lines = self.iter_from_url(data_source.path)
+        elif data_source.source_type == "local":
+            lines = self.iter_from_upload(data_source.path)
+        else:
+            raise RuntimeError(f"不支持的数据源类型: {data_source.source_type}")
+
+        async for line in lines:
+            yield line
+
+    async def iter_from_s3(self, s3_path: str) -> AsyncIterator[bytes]:
+        """从 S3 路径流式读取事件日志行，按 application 分组顺序读取"""
         if not BOTO3_AVAILABLE:
             raise RuntimeError("boto3 未安装，无法使用S3功能")
 
@@ -86,34 +177,59 @@ class MatureDataLoader:
             raise RuntimeError("S3 客户端未初始化")
 
         # 解析 S3 路径
-        s3_path = s3_path.replace("s3://", "")
-        parts = s3_path.split("/", 1)
-        bucket = parts[0]
-        prefix = parts[1] if len(parts) > 1 else ""
+        bucket, prefix = _split_s3_path(s3_path)
 
         try:
-            # 列出所有文件
-            response = self.s3_client.list_objects_v2(
-                Bucket=bucket,
-                Prefix=prefix
-            )
+            response = await asyncio.to_thread(self.s3_client.list_objects_v2, Bucket=bucket, Prefix=prefix)
+        except ClientError as e:
+            raise RuntimeError(f"S3 错误: {str(e)}")
 
-            if 'Contents' not in response:
-                raise RuntimeError("未找到任何文件")
+        if 'Contents' not in response:
+            raise RuntimeError("未找到任何文件")
 
-            # 按作业组织文件
-            job_files = self._organize_s3_files(response['Contents'], bucket, prefix)
+        job_files = self._organize_s3_files(response['Contents'], bucket, prefix)
+        keys = iter([key for files in job_files.values() for key in files['events']])
 
-            # 下载并解析每个作业的文件
-            event_logs = []
-            for job_id, files in job_files.items():
-                job_data = await self._download_s3_job_files(bucket, files)
-                event_logs.append(EventLogData(job_id, job_data))
+        # 按顺序消费文件内容，同时提前为后续文件并发发起 get_object，隐藏单次请求延迟
+        pending = deque()
 
-            return event_logs
+        def prefetch_next():
+            key = next(keys, None)
+            if key is not None:
+                task = asyncio.ensure_future(
+                    asyncio.to_thread(self.s3_client.get_object, Bucket=bucket, Key=key)
+                )
+                pending.append((key, task))
 
-        except ClientError as e:
-            raise RuntimeError(f"S3 错误: {str(e)}")
+        for _ in range(_S3_PREFETCH):
+            prefetch_next()
+
+        try:
+            while pending:
+                event_file, task = pending.popleft()
+                prefetch_next()
+                try:
+                    obj = await task
+                    async for line in _iter_lines(self._iter_s3_body_chunks(obj['Body'])):
+                        yield line
+                except Exception as e:
+                    logger.error(f"下载事件文件失败 {event_file}: {e}")
+        finally:
+            # 提前结束（消费方中断或出错）时，预取的 get_object 响应体同样占用连接池中的连接：
+            # 已完成的直接关闭；线程中的请求无法取消，完成后再关闭
+            for _, task in pending:
+                if task.done():
+                    _close_s3_response(task)
+                else:
+                    task.add_done_callback(_close_s3_response)
+
+    async def _iter_s3_body_chunks(self, body) -> AsyncIterator[bytes]:
+        """分块读取 S3 对象内容，阻塞的网络读取放到线程中执行"""
+        try:
+            while chunk := await asyncio.to_thread(body.read, _STREAM_CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
 
     def _organize_s3_files(self, contents: List[Dict], bucket: str, prefix: str) -> Dict[str, Dict[str, List[str]]]:
         """
@@ -137,8 +253,9 @@ class MatureDataLoader:
             if relative_key.startswith('/'):
                 relative_key = relative_key[1:]
 
-            path_parts = relative_key.split('/')
-            filename = path_parts[-1]
+            # 用下标定位第一级目录和文件名，避免逐个 key split
+            first_slash = relative_key.find('/')
+            filename = relative_key[relative_key.rfind('/') + 1:]
 
             # 跳过 appstatus 开头的文件
             if filename.startswith('appstatus'):
@@ -150,12 +267,12 @@ class MatureDataLoader:
                 if obj.get('Size', 0) < 1024:  # 小于1KB的文件跳过
                     continue
 
-            if len(path_parts) == 1:
+            if first_slash == -1:
                 # 文件直接在根目录下
                 files_in_root.append((key, filename))
             else:
                 # 文件在子目录中
-                subdirs.add(path_parts[0])
+                subdirs.add(relative_key[:first_slash])
 
         # 场景判断：如果根目录下有文件，且子目录不多，优先按直接文件处理
         if files_in_root and (len(subdirs) <= 1 or len(files_in_root) > len(subdirs)):
@@ -174,8 +291,8 @@ class MatureDataLoader:
                 if relative_key.startswith('/'):
                     relative_key = relative_key[1:]
 
-                path_parts = relative_key.split('/')
-                filename = path_parts[-1]
+                first_slash = relative_key.find('/')
+                filename = relative_key[relative_key.rfind('/') + 1:]
 
                 # 跳过 appstatus 开头的文件
                 if filename.startswith('appstatus'):
@@ -186,9 +303,9 @@ class MatureDataLoader:
                     if obj.get('Size', 0) < 1024:
                         continue
 
-                if len(path_parts) > 1:
+                if first_slash != -1:
                     # 使用第一级子目录作为 application_id
-                    application_id = path_parts[0]
+                    application_id = relative_key[:first_slash]
 
                     if application_id not in job_files:
                         job_files[application_id] = {'events': []}
@@ -246,130 +363,71 @@ class MatureDataLoader:
         # 兜底：返回完整文件名
         return name_without_ext
 
-    async def _download_s3_job_files(self, bucket: str, files: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        """下载单个 application 的所有事件文件"""
-        job_data = {'events': []}
-
-        # 下载所有事件文件
-        for event_file in files['events']:
-            try:
-                response = self.s3_client.get_object(Bucket=bucket, Key=event_file)
-                content = response['Body'].read().decode('utf-8')
-                if content.strip():  # 只添加非空内容
-                    job_data['events'].append(content)
-            except Exception as e:
-                logger.error(f"下载事件文件失败 {event_file}: {e}")
-
-        return job_data
-
-    async def load_from_url(self, url: str) -> List[EventLogData]:
-        """
-        从 HTTP URL 下载 ZIP 文件并解析
-
-        Args:
-            url: HTTP URL 指向 ZIP 文件
-
-        Returns:
-            List[EventLogData]: 解析后的事件日志数据列表
-        """
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-
-                # 创建临时文件
-                with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_file:
-                    temp_file.write(response.content)
-                    temp_path = temp_file.name
-
-                # 解析 ZIP 文件
-                event_logs = await self._extract_and_parse_zip(temp_path)
-
-                # 清理临时文件
-                Path(temp_path).unlink()
-
-                return event_logs
-
-        except httpx.RequestError as e:
-            raise RuntimeError(f"下载失败: {str(e)}")
-        except Exception as e:
-            raise RuntimeError(f"处理失败: {str(e)}")
-
-    async def load_from_upload(self, file_path: str) -> List[EventLogData]:
+    async def iter_from_url(self, url: str) -> AsyncIterator[bytes]:
         """
-        从文件/目录路径解析（支持ZIP文件、直接文件和目录）
+        从 HTTP URL 流式读取事件日志行
 
-        Args:
-            file_path: 文件或目录路径
-
-        Returns:
-            List[EventLogData]: 解析后的事件日志数据列表
+        ZIP 需要随机访问，响应体分块写入临时文件（不在内存中保留），解压到临时目录后逐文件按行读取。
         """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            zip_path = Path(temp_dir) / "eventlogs.zip"
+            try:
+                async with self._get_http_client().stream("GET", url) as response:
+                    response.raise_for_status()
+                    async with aiofiles.open(zip_path, 'wb') as f:
+                        async for chunk in response.aiter_bytes(_STREAM_CHUNK_SIZE):
+                            await f.write(chunk)
+            except httpx.RequestError as e:
+                raise RuntimeError(f"下载失败: {str(e)}")
+
+            async for line in self._iter_zip_lines(zip_path):
+                yield line
+
+    async def iter_from_upload(self, file_path: str) -> AsyncIterator[bytes]:
+        """从文件/目录路径流式读取事件日志行（支持ZIP文件、直接文件和目录）"""
         file_path = Path(file_path)
 
         if not file_path.exists():
             raise RuntimeError(f"路径不存在: {file_path}")
 
-        try:
-            if file_path.is_dir():
-                # 处理目录
-                return await self._load_from_directory(file_path)
-            elif file_path.suffix.lower() == '.zip':
-                # 解析 ZIP 文件
-                return await self._extract_and_parse_zip(str(file_path))
-            else:
-                # 直接处理单个文件
-                async with aiofiles.open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = await f.read()
-                    if content.strip():
-                        job_data = {'events': [content]}
-                        return [EventLogData('single_job', job_data)]
-                    else:
-                        raise RuntimeError("文件内容为空")
-
-        except Exception as e:
-            raise RuntimeError(f"文件处理失败: {str(e)}")
-
-    async def _load_from_directory(self, dir_path: Path) -> List[EventLogData]:
-        """
-        从目录加载事件日志文件 - 支持两种场景：
-        1. 直接文件：目录下直接是事件日志文件，同前缀的是同一个application
-        2. 子目录：目录下有子目录，每个子目录包含事件日志文件
-        """
-        # 使用与解压文件相同的组织逻辑
-        job_files = self._organize_extracted_files(dir_path)
-
-        if not job_files:
-            raise RuntimeError("目录中没有找到有效的事件日志文件")
-
-        # 解析每个 application 的文件
-        event_logs = []
-        for application_id, files in job_files.items():
-            job_data = await self._read_local_job_files(files)
-            if job_data['events']:  # 只有当有事件数据时才添加
-                event_logs.append(EventLogData(application_id, job_data))
-
-        return event_logs
-
-    async def _extract_and_parse_zip(self, zip_path: str) -> List[EventLogData]:
-        """解压并解析 ZIP 文件"""
-        event_logs = []
+        if file_path.is_dir():
+            job_files = self._organize_extracted_files(file_path)
+            if not job_files:
+                raise RuntimeError("目录中没有找到有效的事件日志文件")
+            async for line in self._iter_local_job_lines(job_files):
+                yield line
+        elif file_path.suffix.lower() == '.zip':
+            async for line in self._iter_zip_lines(file_path):
+                yield line
+        else:
+            async for line in _iter_lines(self._iter_local_file_chunks(file_path)):
+                yield line
 
+    async def _iter_zip_lines(self, zip_path: Path) -> AsyncIterator[bytes]:
+        """解压 ZIP 到临时目录并按 application 分组逐行读取"""
         with tempfile.TemporaryDirectory() as temp_dir:
-            # 解压 ZIP 文件
             with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                zip_ref.extractall(temp_dir)
+                await asyncio.to_thread(zip_ref.extractall, temp_dir)
 
-            # 扫描解压后的目录结构
-            temp_path = Path(temp_dir)
-            job_files = self._organize_extracted_files(temp_path)
+            job_files = self._organize_extracted_files(Path(temp_dir))
+            async for line in self._iter_local_job_lines(job_files):
+                yield line
 
-            # 解析每个作业的文件
-            for job_id, files in job_files.items():
-                job_data = await self._read_local_job_files(files)
-                event_logs.append(EventLogData(job_id, job_data))
+    async def _iter_local_job_lines(self, job_files: Dict[str, Dict[str, List[Path]]]) -> AsyncIterator[bytes]:
+        """按 application 分组顺序逐行读取本地事件文件"""
+        for files in job_files.values():
+            for event_file in files['events']:
+                try:
+                    async for line in _iter_lines(self._iter_local_file_chunks(event_file)):
+                        yield line
+                except Exception as e:
+                    logger.error(f"读取事件文件失败 {event_file}: {e}")
 
-        return event_logs
+    async def _iter_local_file_chunks(self, file_path: Path) -> AsyncIterator[bytes]:
+        """分块读取本地文件"""
+        async with aiofiles.open(file_path, 'rb') as f:
+            while chunk := await f.read(_STREAM_CHUNK_SIZE):
+                yield chunk
 
     def _organize_extracted_files(self, base_path: Path) -> Dict[str, Dict[str, List[Path]]]:
         """
@@ -478,22 +536,6 @@ class MatureDataLoader:
             job_files[prefix]['events'].extend(file_paths)
             logger.info(f"本地应用 '{prefix}' 包含 {len(file_paths)} 个事件文件")
 
-    async def _read_local_job_files(self, files: Dict[str, List[Path]]) -> Dict[str, List[str]]:
-        """读取本地 application 的所有事件文件"""
-        job_data = {'events': []}
-
-        # 读取所有事件文件
-        for event_file in files['events']:
-            try:
-                async with aiofiles.open(event_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = await f.read()
-                    if content.strip():  # 只添加非空内容
-                        job_data['events'].append(content)
-            except Exception as e:
-                logger.error(f"读取事件文件失败 {event_file}: {e}")
-
-        return job_data
-
     async def validate_data_source(self, data_source: DataSource) -> Dict[str, Any]:
         """
         验证数据源的有效性
@@ -518,18 +560,21 @@ class MatureDataLoader:
                     validation_result["error_message"] = f"本地文件不存在: {data_source.path}"
                     return validation_result
 
-                if not path.is_file():
+                # 目录同样可以读取（按 application 分组）
+                if path.is_dir():
+                    validation_result["info"]["is_directory"] = True
+                elif not path.is_file():
                     validation_result["error_message"] = f"路径不是文件: {data_source.path}"
                     return validation_result
+                else:
+                    # 检查文件大小
+                    file_size = path.stat().st_size
+                    validation_result["info"]["file_size"] = file_size
+                    validation_result["info"]["file_size_mb"] = round(file_size / 1024 / 1024, 2)
 
-                # 检查文件大小
-                file_size = path.stat().st_size
-                validation_result["info"]["file_size"] = file_size
-                validation_result["info"]["file_size_mb"] = round(file_size / 1024 / 1024, 2)
-
-                # 检查文件扩展名
-                if path.suffix.lower() not in ['.log', '.eventlog', '.json', '.txt', '.zip', '']:
-                    validation_result["warnings"].append(f"文件扩展名 '{path.suffix}' 可能不是有效的事件日志格式")
+                    # 检查文件扩展名
+                    if path.suffix.lower() not in ['.log', '.eventlog', '.json', '.txt', '.zip', '']:
+                        validation_result["warnings"].append(f"文件扩展名 '{path.suffix}' 可能不是有效的事件日志格式")
 
             elif data_source.source_type == "s3":
                 # S3路径格式验证
@@ -538,13 +583,13 @@ class MatureDataLoader:
                     return validation_result
 
                 # 基础路径解析
-                parts = data_source.path[5:].split("/", 1)
-                if len(parts) < 2:
+                if data_source.path.find("/", 5) == -1:
                     validation_result["error_message"] = "S3路径格式不正确，需要包含bucket和key"
                     return validation_result
 
-                validation_result["info"]["bucket"] = parts[0]
-                validation_result["info"]["key"] = parts[1]
+                bucket, key = _split_s3_path(data_source.path)
+                validation_result["info"]["bucket"] = bucket
+                validation_result["info"]["key"] = key
 
             elif data_source.source_type == "url":
                 # URL格式验证
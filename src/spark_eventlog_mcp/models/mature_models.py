@@ -158,6 +158,7 @@ class MatureAnalysisResult(BaseModel):
     total_jobs: int = Field(default=0, description="总作业数")
     successful_jobs: int = Field(default=0, description="成功作业数")
     failed_jobs: int = Field(default=0, description="失败作业数")
+    total_tasks: int = Field(default=0, description="总任务数（各作业任务数之和）")
 
     # Executor 信息
     executors: List[ExecutorMetrics] = Field(default_factory=list, description="Executor 列表")
@@ -205,10 +206,3 @@ class FieldDescriptions(BaseModel):
         default_factory=dict,
         description="按类别组织的字段描述"
     )
-
-# Event Log 数据容器
-class EventLogData:
-    """Event Log 数据容器"""
-    def __init__(self, job_id: str, files: Dict[str, List[str]]):
-        self.job_id = job_id
-        self.files = files  # {'events': [...], 'appstatus': [...]}
\ No newline at end of file
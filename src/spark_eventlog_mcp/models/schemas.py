@@ -189,6 +189,9 @@ class AnalyzePerformanceInput(BaseModel):
     data_source: Optional[DataSource] = Field(
         None, description="Data source (if not already parsed)"
     )
+    include_full_result: bool = Field(
+        False, description="Include the full serialized analysis result in the response (summary only otherwise)"
+    )
 
 class GenerateReportInput(BaseModel):
     """
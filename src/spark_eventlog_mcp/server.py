@@ -12,17 +12,18 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 
 # Import FastAPI and FastMCP
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-from fastmcp import FastMCP
+from fastapi.responses import FileResponse
+from fastmcp import FastMCP, Context
 
 # Import our modules
 from .utils.helpers import setup_logging, load_config_from_env
-from .utils.middleware import log_requests_middleware
+from .utils.middleware import LoggingMiddleware
 from .utils.uvicorn_config import get_uvicorn_log_config
 from .tools.mcp_tools import (
-    generate_report_tool, get_analysis_status_tool, clear_session_tool, set_server_config
+    generate_report_tool, get_analysis_status_tool, clear_session_tool, set_server_config,
+    mature_data_loader
 )
 
 # Load configuration
@@ -46,7 +47,7 @@ mcp = FastMCP(
 # ==================== MCP Tools ====================
 
 @mcp.tool()
-async def generate_report(path: str) -> Dict[str, Any]:
+async def generate_report(path: str, ctx: Context) -> Dict[str, Any]:
     """
     Generate comprehensive Spark event log analysis reports from S3 or URL paths
 
@@ -66,11 +67,11 @@ async def generate_report(path: str) -> Dict[str, Any]:
     Returns:
         Complete analysis report with metadata, visualization URL, and optimization suggestions
     """
-    return await generate_report_tool(path, config["html_report_host_address"])
+    return await generate_report_tool(path, config["html_report_host_address"], ctx.session_id)
 
 
 @mcp.tool()
-async def get_analysis_status()-> Dict[str, Any]:
+async def get_analysis_status(ctx: Context)-> Dict[str, Any]:
     """
     Get current analysis session status and summary information
 
@@ -80,11 +81,11 @@ async def get_analysis_status()-> Dict[str, Any]:
     Returns:
         Current session status and summary
     """
-    return await get_analysis_status_tool()
+    return await get_analysis_status_tool(ctx.session_id)
 
 
 @mcp.tool()
-async def clear_session()-> Dict[str, Any]:
+async def clear_session(ctx: Context)-> Dict[str, Any]:
     """
     Clear current analysis session and cached data
 
@@ -94,7 +95,7 @@ async def clear_session()-> Dict[str, Any]:
     Returns:
         Confirmation of session clearing
     """
-    return await clear_session_tool()
+    return await clear_session_tool(ctx.session_id)
 
 # ==================== MCP Resources ====================
 
@@ -169,6 +170,7 @@ async def fastapi_lifespan(app: FastAPI):
     logger.info("FastAPI app starting up...")
     yield
     logger.info("FastAPI app shutting down...")
+    await mature_data_loader.aclose()
 
 # Combine lifespans
 @asynccontextmanager
@@ -186,11 +188,8 @@ fastapi_app = FastAPI(
     lifespan=combined_lifespan
 )
 
-# Add request logging middleware
-@fastapi_app.middleware("http")
-async def log_requests(request, call_next):
-    """Request logging middleware"""
-    return await log_requests_middleware(request, call_next)
+# Add request logging middleware (pure ASGI, no call_next task group per request)
+fastapi_app.add_middleware(LoggingMiddleware, log_request_body=config["log_request_body"])
 
 # ==================== FastAPI HTTP Endpoints ====================
 
@@ -256,8 +255,33 @@ async def list_reports():
         logger.error(f"Failed to list reports: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to list reports: {str(e)}")
 
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """按 Accept-Encoding 的 q 值判断客户端是否接受 gzip：显式的 gzip 条目优先于 *，q=0 表示不接受"""
+    gzip_q = None
+    wildcard_q = None
+    for entry in accept_encoding.split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "x-gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard_q = q
+        else:
+            gzip_q = q if gzip_q is None else max(gzip_q, q)
+    if gzip_q is None:
+        gzip_q = wildcard_q
+    return gzip_q is not None and gzip_q > 0
+
 @fastapi_app.get("/api/reports/{filename}")
-async def get_report_html(filename: str):
+async def get_report_html(filename: str, request: Request):
     """直接返回 HTML 报告文件,在浏览器中显示"""
     try:
         file_path = REPORT_DATA_DIR / filename
@@ -272,11 +296,15 @@ async def get_report_html(filename: str):
         if file_path.suffix.lower() not in [".html", ".htm"]:
             raise HTTPException(status_code=400, detail=f"Not an HTML file: {filename}")
 
-        # 读取 HTML 文件内容并直接返回
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        # 客户端支持 gzip 且存在预压缩副本时直接返回压缩文件
+        headers = {"Vary": "Accept-Encoding"}
+        gz_path = file_path.with_name(file_path.name + ".gz")
+        if _accepts_gzip(request.headers.get("accept-encoding", "")) and gz_path.is_file():
+            headers["Content-Encoding"] = "gzip"
+            file_path = gz_path
 
-        return HTMLResponse(content=html_content, status_code=200)
+        # 分块流式返回文件，不在内存中读取整个报告
+        return FileResponse(file_path, media_type="text/html; charset=utf-8", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -295,8 +323,9 @@ async def delete_report(filename: str):
         if not file_path.is_file():
             raise HTTPException(status_code=400, detail=f"Not a file: {filename}")
 
-        # 删除文件
+        # 删除文件及其 gzip 预压缩副本
         file_path.unlink()
+        file_path.with_name(file_path.name + ".gz").unlink(missing_ok=True)
         logger.info(f"Deleted report: {filename}")
 
         return {
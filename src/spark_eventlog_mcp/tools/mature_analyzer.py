@@ -5,17 +5,65 @@ Spark Event Log 核心分析器 - 基于真实数据结构 (复制的成熟实
 import json
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, AsyncIterator, Union
 from collections import defaultdict, Counter
 from dataclasses import dataclass
 import logging
 
+# orjson 为可选依赖，不可用时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
 from ..models.mature_models import (
     MatureAnalysisResult, JobMetrics, ExecutorMetrics, DriverMetrics, ShuffleStageMetrics,
     ShuffleAnalysis, PerformanceMetrics, OptimizationRecommendations,
-    FieldDescription, FieldDescriptions, EventLogData
+    FieldDescription, FieldDescriptions
 )
 
+def _loads_event(line: Union[str, bytes]) -> Dict[str, Any]:
+    """解析单行事件 JSON，优先使用 orjson"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # orjson 不接受 NaN / 超出 64 位的整数、无效 UTF-8 等，交给标准库再试一次
+            pass
+    if isinstance(line, (bytes, bytearray)):
+        # 与按文本读取日志时一致：忽略无效的 UTF-8 字节
+        line = line.decode('utf-8', 'ignore')
+    return json.loads(line)
+
+def flatten_optimization_suggestions(recommendations: List[OptimizationRecommendations],
+                                     focus_areas: List[str] = None,
+                                     priority_filter: str = None) -> List[Dict[str, Any]]:
+    """将分析结果中的优化建议展开为扁平列表并按类别/优先级过滤（只依赖结果，不需要分析器状态）"""
+    # 提取所有建议
+    suggestions = []
+    for rec in recommendations:
+        for suggestion in rec.recommendations:
+            suggestion_dict = {
+                'category': rec.category,
+                'priority': suggestion.get('priority', 'MEDIUM'),
+                'title': suggestion.get('title', ''),
+                'description': suggestion.get('description', ''),
+                'suggestion': suggestion.get('suggestion', ''),
+                'config_parameters': {suggestion.get('config', ''): ''} if suggestion.get('config') else {}
+            }
+            suggestions.append(suggestion_dict)
+
+    # 应用过滤器
+    if focus_areas:
+        suggestions = [s for s in suggestions if s['category'].lower() in [area.lower() for area in focus_areas]]
+
+    if priority_filter:
+        suggestions = [s for s in suggestions if s['priority'] == priority_filter.upper()]
+
+    return suggestions
+
 @dataclass
 class TaskMetrics:
     """任务指标 - 基于真实 Event Log 结构"""
@@ -82,19 +130,25 @@ class MatureSparkEventLogAnalyzer:
         self.hadoop_properties = {}
         self.sql_executions = {}  # SQL 执行信息
 
-    def analyze(self, event_logs: List[EventLogData]) -> MatureAnalysisResult:
+    async def analyze_stream(self, lines: AsyncIterator[Union[str, bytes]]) -> MatureAnalysisResult:
         """
-        分析事件日志并返回正确结果
+        流式分析事件日志：逐行消费数据加载器产出的事件，边下载边解析，内存占用与单行大小相当
+
+        解析状态保存在实例上且跨越 await，同一实例不能同时用于多个分析，每次分析应使用新的实例。
         """
         self.reset()
 
-        # 解析所有事件日志
-        logging.info(f"parse_event_log starting...")
-        for log_data in event_logs:
-            self._parse_event_log(log_data)
-        logging.info(f"parse_event_log complated.")
+        logging.info("parse_event_log starting...")
+        async for line in lines:
+            self._process_line(line)
+        logging.info("parse_event_log completed.")
 
+        return self._build_result()
+
+    def _build_result(self) -> MatureAnalysisResult:
+        """根据已解析的事件状态执行分析并组装结果"""
         # 执行正确的分析
+        jobs = self._analyze_jobs_correctly()
         result = MatureAnalysisResult(
             application_id=self.application_info.get('appId', 'unknown'),
             application_name=self.application_info.get('appName', 'unknown'),
@@ -102,8 +156,9 @@ class MatureSparkEventLogAnalyzer:
             start_time=self._parse_timestamp(self.application_info.get('startTime', 0)),
             end_time=self._parse_timestamp(self.application_info.get('endTime', 0)) if self.application_info.get('endTime') else None,
             duration_ms=self.application_info.get('duration'),
-            jobs=self._analyze_jobs_correctly(),
-            total_jobs=len(self.jobs),
+            jobs=jobs,
+            total_jobs=len(jobs),
+            total_tasks=sum(job.num_tasks for job in jobs),
             successful_jobs=len([j for j in self.jobs.values() if j.get('result', {}).get('Result') == 'JobSucceeded']),
             failed_jobs=len([j for j in self.jobs.values() if j.get('result', {}).get('Result') != 'JobSucceeded']),
             executors=self._analyze_executors_correctly(),
@@ -119,16 +174,15 @@ class MatureSparkEventLogAnalyzer:
 
         return result
 
-    def _parse_event_log(self, log_data: EventLogData):
-        """解析单个作业的事件日志"""
-        for event_content in log_data.files['events']:
-            for line in event_content.strip().split('\n'):
-                if line.strip():
-                    try:
-                        event = json.loads(line)
-                        self._process_event_correctly(event)
-                    except json.JSONDecodeError as e:
-                        self.logger.error(f"解析事件失败: {e}, 行内容: {line[:100]}...")
+    def _process_line(self, line: Union[str, bytes]):
+        """解析并处理单行事件"""
+        try:
+            event = _loads_event(line)
+        except ValueError as e:
+            # JSONDecodeError 与无效 UTF-8 字节引起的 UnicodeDecodeError 都是 ValueError，只跳过这一行
+            self.logger.error(f"解析事件失败: {e}, 行内容: {line[:100]}...")
+            return
+        self._process_event_correctly(event)
 
     def _process_event_correctly(self, event: Dict[str, Any]):
         """正确处理单个事件"""
@@ -923,27 +977,6 @@ class MatureSparkEventLogAnalyzer:
 
     def get_optimization_suggestions(self, focus_areas: List[str] = None, priority_filter: str = None) -> List[Dict[str, Any]]:
         """获取优化建议 - 兼容接口"""
-        all_recommendations = self._generate_correct_recommendations()
-
-        # 提取所有建议
-        suggestions = []
-        for rec in all_recommendations:
-            for suggestion in rec.recommendations:
-                suggestion_dict = {
-                    'category': rec.category,
-                    'priority': suggestion.get('priority', 'MEDIUM'),
-                    'title': suggestion.get('title', ''),
-                    'description': suggestion.get('description', ''),
-                    'suggestion': suggestion.get('suggestion', ''),
-                    'config_parameters': {suggestion.get('config', ''): ''} if suggestion.get('config') else {}
-                }
-                suggestions.append(suggestion_dict)
-
-        # 应用过滤器
-        if focus_areas:
-            suggestions = [s for s in suggestions if s['category'].lower() in [area.lower() for area in focus_areas]]
-
-        if priority_filter:
-            suggestions = [s for s in suggestions if s['priority'] == priority_filter.upper()]
-
-        return suggestions
\ No newline at end of file
+        return flatten_optimization_suggestions(
+            self._generate_correct_recommendations(), focus_areas, priority_filter
+        )
\ No newline at end of file
@@ -2,26 +2,33 @@
 HTML 报告生成器
 """
 
+import asyncio
+import heapq
 import json
 import os
+import zlib
 import aiofiles
+import numpy as np
+from functools import lru_cache
+from string import Template
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterator
 from pathlib import Path
 from ..models.mature_models import MatureAnalysisResult
 
-class HTMLReportGenerator:
-    """HTML 可视化报告生成器"""
-
-    def __init__(self):
-        self.template = self._load_template()
-
-    def _load_template(self) -> str:
-        # <link rel="preconnect" href="https://fonts.googleapis.com">
-        # <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
-        # <link href="https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@300;400;500;600;700&family=Orbitron:wght@400;500;700;900&display=swap" rel="stylesheet">
-        """加载 HTML 模板"""
-        return """
+# orjson 为可选依赖，不可用时回退到标准库 json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# HTML 模板，模块导入时构建一次
+# <link rel="preconnect" href="https://fonts.googleapis.com">
+# <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+# <link href="https://fonts.googleapis.com/css2?family=JetBrains+Mono:wght@300;400;500;600;700&family=Orbitron:wght@400;500;700;900&display=swap" rel="stylesheet">
+_HTML_TEMPLATE = """
         <!DOCTYPE html>
         <html lang="zh-CN">
         <head>
@@ -145,6 +152,8 @@ class HTMLReportGenerator:
                     transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
                     backdrop-filter: blur(20px);
                     box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
+                    /* 悬停重绘限制在卡片内部，不影响相邻卡片 */
+                    contain: paint;
                 }
 
                 .metric-panel::before {
@@ -594,6 +603,7 @@ class HTMLReportGenerator:
                     padding: 30px;
                     margin: 30px 0;
                     position: relative;
+                    contain: paint;
                 }
 
                 .chart-title {
@@ -612,6 +622,22 @@ class HTMLReportGenerator:
                     padding-bottom: 15px;
                 }
 
+                .chart-note {
+                    margin: -10px 0 15px;
+                    text-align: center;
+                    font-size: 0.85rem;
+                    color: var(--text-secondary);
+                }
+
+                .chart-note:empty {
+                    display: none;
+                }
+
+                /* 图表延迟渲染前预留 Plotly 默认高度，避免滚动时布局跳动 */
+                [data-renderer] {
+                    min-height: 450px;
+                }
+
                 .chart-title::after {
                     content: '';
                     position: absolute;
@@ -1031,7 +1057,7 @@ class HTMLReportGenerator:
                     left: 0;
                     right: 0;
                     height: 3px;
-                    background: linear-gradient(90deg, var(--accent-primary), var(--accent-secondary), var(--accent-success));
+                    background: var(--accent-primary);
                 }
 
                 .data-table th,
@@ -1062,7 +1088,7 @@ class HTMLReportGenerator:
                     left: 0;
                     right: 0;
                     height: 2px;
-                    background: linear-gradient(90deg, transparent, var(--accent-primary), transparent);
+                    background: var(--accent-primary);
                 }
 
                 .data-table td {
@@ -1076,7 +1102,7 @@ class HTMLReportGenerator:
                 }
 
                 .data-table tbody tr:hover {
-                    background: linear-gradient(90deg, rgba(59, 130, 246, 0.1), rgba(139, 92, 246, 0.1));
+                    background: rgba(99, 111, 246, 0.1);
                     transform: translateX(5px);
                     box-shadow: inset 4px 0 0 var(--accent-primary);
                 }
@@ -1120,7 +1146,7 @@ class HTMLReportGenerator:
                 }
 
                 .sortable:hover {
-                    background: linear-gradient(135deg, var(--bg-accent) 0%, rgba(59, 130, 246, 0.1) 100%);
+                    background: var(--bg-accent);
                     transform: translateY(-2px);
                 }
 
@@ -1203,7 +1229,7 @@ class HTMLReportGenerator:
                     <div class="metric-panel panel-combined">
                         <div class="panel-header">
                             <h3 class="panel-title">🚀 应用 & 集群统览</h3>
-                            <div class="panel-subtitle">{{application_name}} • {{spark_version}} • {{total_executors}} 个executor节点</div>
+                            <div class="panel-subtitle">${application_name} • ${spark_version} • ${total_executors} 个executor节点</div>
                         </div>
 
                         <div class="combined-layout">
@@ -1215,28 +1241,28 @@ class HTMLReportGenerator:
                                         <span class="metric-icon">🆔</span>
                                         <div class="metric-content">
                                             <span class="metric-label-compact">Application ID</span>
-                                            <span class="metric-value-compact">{{application_id}}</span>
+                                            <span class="metric-value-compact">${application_id}</span>
                                         </div>
                                     </div>
                                     <div class="metric-compact">
                                         <span class="metric-icon">⏱️</span>
                                         <div class="metric-content">
                                             <span class="metric-label-compact">Duration</span>
-                                            <span class="metric-value-compact highlight">{{duration_formatted}}</span>
+                                            <span class="metric-value-compact highlight">${duration_formatted}</span>
                                         </div>
                                     </div>
                                     <div class="metric-compact">
                                         <span class="metric-icon">📋</span>
                                         <div class="metric-content">
                                             <span class="metric-label-compact">Total Jobs</span>
-                                            <span class="metric-value-compact">{{total_jobs}}</span>
+                                            <span class="metric-value-compact">${total_jobs}</span>
                                         </div>
                                     </div>
                                     <div class="metric-compact">
                                         <span class="metric-icon">✅</span>
                                         <div class="metric-content">
                                             <span class="metric-label-compact">Success Rate</span>
-                                            <span class="metric-value-compact highlight">{{success_rate}}%</span>
+                                            <span class="metric-value-compact highlight">${success_rate}%</span>
                                         </div>
                                     </div>
                                 </div>
@@ -1245,33 +1271,33 @@ class HTMLReportGenerator:
                             <!-- 右侧：Executor 集群资源 -->
                             <div class="executor-section">
                                 <h4 class="section-title">💻 Executor 资源</h4>
-                                <div class="cluster-summary">{{executor_cores_config}} 核 • {{executor_memory_config}}</div>
+                                <div class="cluster-summary">${executor_cores_config} 核 • ${executor_memory_config}</div>
                                 <div class="resource-stats-mini">
                                     <div class="stat-card-mini">
                                         <span class="stat-icon">💾</span>
                                         <div class="stat-content">
-                                            <div class="stat-value highlight">{{executor_total_memory}}</div>
+                                            <div class="stat-value highlight">${executor_total_memory}</div>
                                             <div class="stat-label">Total Memory</div>
                                         </div>
                                     </div>
                                     <div class="stat-card-mini">
                                         <span class="stat-icon">🗄️</span>
                                         <div class="stat-content">
-                                            <div class="stat-value highlight">{{executor_overhead_memory}}</div>
+                                            <div class="stat-value highlight">${executor_overhead_memory}</div>
                                             <div class="stat-label">Overhead Memory</div>
                                         </div>
                                     </div>
                                     <div class="stat-card-mini">
                                         <span class="stat-icon">⚡</span>
                                         <div class="stat-content">
-                                            <div class="stat-value">{{peak_memory_formatted}}</div>
+                                            <div class="stat-value">${peak_memory_formatted}</div>
                                             <div class="stat-label">Peak Memory</div>
                                         </div>
                                     </div>
                                     <div class="stat-card-mini">
                                         <span class="stat-icon">🔄</span>
                                         <div class="stat-content">
-                                            <div class="stat-value">{{avg_executor_overhead_memory}}</div>
+                                            <div class="stat-value">${avg_executor_overhead_memory}</div>
                                             <div class="stat-label">Overhead/Exec</div>
                                         </div>
                                     </div>
@@ -1291,19 +1317,19 @@ class HTMLReportGenerator:
                                 <div class="compact-metrics">
                                     <div class="compact-metric">
                                         <span class="compact-label">Read</span>
-                                        <span class="compact-value highlight">{{shuffle_read_formatted}}</span>
+                                        <span class="compact-value highlight">${shuffle_read_formatted}</span>
                                     </div>
                                     <div class="compact-metric">
                                         <span class="compact-label">Write</span>
-                                        <span class="compact-value highlight">{{shuffle_write_formatted}}</span>
+                                        <span class="compact-value highlight">${shuffle_write_formatted}</span>
                                     </div>
                                     <div class="compact-metric">
                                         <span class="compact-label">Records</span>
-                                        <span class="compact-value">{{shuffle_records_formatted}}</span>
+                                        <span class="compact-value">${shuffle_records_formatted}</span>
                                     </div>
                                     <div class="compact-metric">
                                         <span class="compact-label">Efficiency</span>
-                                        <span class="compact-value">{{shuffle_efficiency}}</span>
+                                        <span class="compact-value">${shuffle_efficiency}</span>
                                     </div>
                                 </div>
                             </div>
@@ -1319,19 +1345,19 @@ class HTMLReportGenerator:
                                 <div class="compact-metrics">
                                     <div class="compact-metric">
                                         <span class="compact-label">Cores</span>
-                                        <span class="compact-value">{{driver_cores}}</span>
+                                        <span class="compact-value">${driver_cores}</span>
                                     </div>
                                     <div class="compact-metric">
                                         <span class="compact-label">Memory</span>
-                                        <span class="compact-value highlight">{{driver_memory}}</span>
+                                        <span class="compact-value highlight">${driver_memory}</span>
                                     </div>
                                     <div class="compact-metric">
                                         <span class="compact-label">Overhead Memory</span>
-                                        <span class="compact-value highlight">{{driver_overhead_memory_formatted}}</span>
+                                        <span class="compact-value highlight">${driver_overhead_memory_formatted}</span>
                                     </div>
                                     <div class="compact-metric">
                                         <span class="compact-label">GC Time</span>
-                                        <span class="compact-value">{{driver_gc_time_formatted}}</span>
+                                        <span class="compact-value">${driver_gc_time_formatted}</span>
                                     </div>
                                 </div>
                             </div>
@@ -1342,213 +1368,140 @@ class HTMLReportGenerator:
                 <!-- Shuffle Stage 分析图表 -->
                 <div class="chart-container">
                     <h3 class="chart-title">🔄 Shuffle 密集型 Stage 分析</h3>
-                    <div id="shuffleStagesChart"></div>
+                    <div id="shuffleStagesChart" data-renderer="createShuffleStagesChart" data-payload="shuffle_stages"></div>
                 </div>
 
                 <!-- Executor 资源使用图表 -->
                 <div class="chart-container">
                     <h3 class="chart-title">💻 Executor 资源使用分布</h3>
-                    <div id="executorResourceChart"></div>
+                    <p class="chart-note" data-downsampled-note="executor_resources"></p>
+                    <div id="executorResourceChart" data-renderer="createExecutorResourceChart" data-payload="executor_resources"></div>
                 </div>
 
                 <!-- Executor 按 Stage 的 Shuffle 使用分布 -->
                 <div class="chart-container">
                     <h3 class="chart-title">🎯 Stage-Executor Shuffle 分布</h3>
-                    <div id="stageExecutorShuffleChart"></div>
+                    <p class="chart-note" data-downsampled-note="stage_executor_shuffle"></p>
+                    <div id="stageExecutorShuffleChart" data-renderer="createStageExecutorShuffleChart" data-payload="stage_executor_shuffle"></div>
                 </div>
 
                 <!-- 数据倾斜分析 -->
                 <div class="chart-container">
                     <h3 class="chart-title">⚖️ 数据倾斜检测</h3>
-                    <div id="dataSkewChart"></div>
+                    <div id="dataSkewChart" data-renderer="createDataSkewChart" data-payload="data_skew"></div>
                 </div>
 
                 <!-- 优化建议 -->
                 <div class="chart-container recommendations-panel">
                     <h3 class="chart-title">💡 智能优化建议</h3>
                     <div class="recommendations-grid">
-                        {{recommendations_html}}
+                        ${recommendations_html}
                     </div>
                 </div>
 
                 <!-- 详细指标表格 -->
                 <div class="chart-container">
                     <h3 class="chart-title">📊 详细Executor Shuffle信息</h3>
-                    {{metrics_table}}
+                    ${metrics_table}
                 </div>
             </div>
 
             <script>
-                // Shuffle Stage 分析图表 - 读写分离
-                function createShuffleStagesChart(data) {
-                    const trace1 = {
-                        x: data.stage_names,
-                        y: data.shuffle_read_bytes,
-                        name: 'Shuffle Read',
-                        type: 'bar',
-                        marker: {
-                            color: '#3b82f6',
-                            line: {
-                                color: '#1e40af',
-                                width: 1
-                            }
-                        },
-                        text: data.shuffle_read_bytes.map(bytes => formatBytes(bytes)),
-                        textposition: 'auto',
-                        hovertemplate: '<b>%{x}</b><br>Shuffle Read: %{text}<extra></extra>'
-                    };
-
-                    const trace2 = {
-                        x: data.stage_names,
-                        y: data.shuffle_write_bytes,
-                        name: 'Shuffle Write',
-                        type: 'bar',
-                        marker: {
-                            color: '#8b5cf6',
-                            line: {
-                                color: '#6d28d9',
-                                width: 1
-                            }
-                        },
-                        text: data.shuffle_write_bytes.map(bytes => formatBytes(bytes)),
-                        textposition: 'auto',
-                        hovertemplate: '<b>%{x}</b><br>Shuffle Write: %{text}<extra></extra>'
-                    };
-
-                    const layout = {
+                const COLORS = ['#3b82f6', '#8b5cf6', '#10b981', '#f59e0b', '#ef4444'];
+                // 数据点超过该阈值的散点图改用 WebGL 渲染
+                const GL_THRESHOLD = 500;
+
+                // 所有图表共用的布局，xaxis / yaxis 按图表合并覆盖
+                function chartLayout(overrides) {
+                    const o = overrides || {};
+                    return Object.assign({
                         paper_bgcolor: 'rgba(0,0,0,0)',
                         plot_bgcolor: 'rgba(0,0,0,0)',
                         font: { color: '#ffffff', family: 'JetBrains Mono' },
-                        xaxis: {
-                            gridcolor: '#333333',
-                            tickfont: { size: 10 }
-                        },
-                        yaxis: {
-                            gridcolor: '#333333',
-                            title: 'Shuffle Bytes'
-                        },
-                        barmode: 'group',
                         margin: { t: 20, b: 50, l: 80, r: 20 }
-                    };
-
-                    Plotly.newPlot('shuffleStagesChart', [trace1, trace2], layout, {
-                        displayModeBar: false,
-                        responsive: true
-                    });
-
-                    // 图例交互：双击单选，单击切换
-                    let shuffleStagesLastClick = 0;
-                    document.getElementById('shuffleStagesChart').on('plotly_legendclick', function(data) {
-                        const chartDiv = document.getElementById('shuffleStagesChart');
-                        const currentTime = new Date().getTime();
-                        const timeDiff = currentTime - shuffleStagesLastClick;
-
-                        if (timeDiff < 400) {
-                            // 双击：单选模式，只显示点击的序列
-                            const update = {};
-                            chartDiv.data.forEach((trace, index) => {
-                                update[`visible[${index}]`] = index === data.curveNumber ? true : false;
-                            });
-                            Plotly.restyle('shuffleStagesChart', update);
-                            shuffleStagesLastClick = 0; // 重置点击时间
-                            return false;
-                        } else {
-                            // 单击：正常切换显示/隐藏
-                            shuffleStagesLastClick = currentTime;
-                            return true; // 允许默认行为
-                        }
+                    }, o, {
+                        xaxis: Object.assign({ gridcolor: '#333333' }, o.xaxis),
+                        yaxis: Object.assign({ gridcolor: '#333333' }, o.yaxis)
                     });
                 }
 
-                // Executor 资源使用图表 - 内存和 Shuffle 分析
-                function createExecutorResourceChart(data) {
-                    const trace1 = {
-                        x: data.executor_ids,
-                        y: data.configured_memory,
-                        name: 'Configured Memory',
-                        type: 'bar',
-                        marker: { color: '#10b981' },
-                        text: data.configured_memory.map(bytes => formatBytes(bytes)),
-                        textposition: 'auto',
-                        hovertemplate: '<b>Executor %{x}</b><br>Configured Memory: %{text}<extra></extra>'
-                    };
-
-                    const trace2 = {
-                        x: data.executor_ids,
-                        y: data.actual_memory_used,
-                        name: 'Actual Memory Used',
-                        type: 'bar',
-                        marker: { color: '#f59e0b' },
-                        text: data.actual_memory_used.map(bytes => formatBytes(bytes)),
-                        textposition: 'auto',
-                        hovertemplate: '<b>Executor %{x}</b><br>Actual Memory: %{text}<extra></extra>'
-                    };
-
-                    const trace3 = {
-                        x: data.executor_ids,
-                        y: data.shuffle_read,
-                        name: 'Shuffle Read',
-                        type: 'bar',
-                        marker: { color: '#3b82f6' },
-                        text: data.shuffle_read.map(bytes => formatBytes(bytes)),
-                        textposition: 'auto',
-                        hovertemplate: '<b>Executor %{x}</b><br>Shuffle Read: %{text}<extra></extra>'
+                // 悬浮检测按数据点总数收紧，点数过多时直接关闭逐点悬浮
+                const HOVER_POINT_LIMIT = 5000;
+                function hoverLayout(traces) {
+                    const totalPoints = traces.reduce((a, t) => a + t.x.length, 0);
+                    return {
+                        hovermode: totalPoints > HOVER_POINT_LIMIT ? false : 'closest',
+                        hoverdistance: 1,
+                        spikedistance: 0
                     };
+                }
 
-                    const trace4 = {
-                        x: data.executor_ids,
-                        y: data.shuffle_write,
-                        name: 'Shuffle Write',
+                // 字节柱状图 trace，柱上文字和悬浮提示使用服务端格式化好的字节数
+                function makeBarTrace(name, x, y, text, color, hovertemplate, marker) {
+                    return {
+                        x: x,
+                        y: y,
+                        name: name,
                         type: 'bar',
-                        marker: { color: '#8b5cf6' },
-                        text: data.shuffle_write.map(bytes => formatBytes(bytes)),
+                        marker: Object.assign({ color: color }, marker),
+                        text: text,
                         textposition: 'auto',
-                        hovertemplate: '<b>Executor %{x}</b><br>Shuffle Write: %{text}<extra></extra>'
+                        hovertemplate: hovertemplate
                     };
+                }
 
-                    const layout = {
-                        paper_bgcolor: 'rgba(0,0,0,0)',
-                        plot_bgcolor: 'rgba(0,0,0,0)',
-                        font: { color: '#ffffff', family: 'JetBrains Mono' },
-                        xaxis: {
-                            gridcolor: '#333333',
-                            title: 'Executor ID'
-                        },
-                        yaxis: {
-                            gridcolor: '#333333',
-                            title: 'Bytes'
-                        },
-                        barmode: 'group',
-                        margin: { t: 20, b: 50, l: 80, r: 20 }
+                // 连续触发的事件只在停止 ms 毫秒后执行一次
+                const debounce = (fn, ms) => {
+                    let t;
+                    return (...a) => {
+                        clearTimeout(t);
+                        t = setTimeout(() => fn(...a), ms);
                     };
+                };
+
+                // 所有图表共用一个防抖的窗口 resize 监听，替代每个图表各自的 responsive 监听
+                window.addEventListener('resize', debounce(() => {
+                    document.querySelectorAll('.js-plotly-plot').forEach(el => Plotly.Plots.resize(el));
+                }, 150));
+
+                // 已创建过的图表改用 Plotly.react 增量更新，避免重建整个绘图上下文
+                const renderedCharts = new Set();
+                function plotChart(divId, traces, layout, config) {
+                    if (renderedCharts.has(divId)) {
+                        Plotly.react(divId, traces, layout, config);
+                    } else {
+                        Plotly.newPlot(divId, traces, layout, config);
+                        renderedCharts.add(divId);
+                    }
+                }
 
-                    Plotly.newPlot('executorResourceChart', [trace1, trace2, trace3, trace4], layout, {
-                        displayModeBar: false,
-                        responsive: true
+                function createBarChart(divId, traces, layoutOverrides) {
+                    const layout = chartLayout(Object.assign({ barmode: 'group' }, hoverLayout(traces), layoutOverrides));
+                    // 图例单击切换、双击单选均使用 Plotly 原生行为
+                    plotChart(divId, traces, layout, {
+                        displayModeBar: false
                     });
+                }
 
-                    // 图例交互：双击单选，单击切换
-                    let executorResourceLastClick = 0;
-                    document.getElementById('executorResourceChart').on('plotly_legendclick', function(data) {
-                        const chartDiv = document.getElementById('executorResourceChart');
-                        const currentTime = new Date().getTime();
-                        const timeDiff = currentTime - executorResourceLastClick;
-
-                        if (timeDiff < 400) {
-                            // 双击：单选模式，只显示点击的序列
-                            const update = {};
-                            chartDiv.data.forEach((trace, index) => {
-                                update[`visible[${index}]`] = index === data.curveNumber ? true : false;
-                            });
-                            Plotly.restyle('executorResourceChart', update);
-                            executorResourceLastClick = 0;
-                            return false;
-                        } else {
-                            // 单击：正常切换显示/隐藏
-                            executorResourceLastClick = currentTime;
-                            return true;
-                        }
-                    });
+                // Shuffle Stage 分析图表 - 读写分离
+                function createShuffleStagesChart(data) {
+                    const hover = label => `<b>%{x}</b><br>${label}: %{text}<extra></extra>`;
+                    createBarChart('shuffleStagesChart', [
+                        makeBarTrace('Shuffle Read', data.stage_names, data.shuffle_read_bytes, data.shuffle_read_bytes_fmt, COLORS[0], hover('Shuffle Read'), { line: { color: '#1e40af', width: 1 } }),
+                        makeBarTrace('Shuffle Write', data.stage_names, data.shuffle_write_bytes, data.shuffle_write_bytes_fmt, COLORS[1], hover('Shuffle Write'), { line: { color: '#6d28d9', width: 1 } })
+                    ], { xaxis: { tickfont: { size: 10 } }, yaxis: { title: 'Shuffle Bytes' } });
+                }
+
+                // Executor 资源使用图表 - 内存和 Shuffle 分析
+                function createExecutorResourceChart(data) {
+                    const hover = label => `<b>Executor %{x}</b><br>${label}: %{text}<extra></extra>`;
+                    const x = data.executor_ids;
+                    createBarChart('executorResourceChart', [
+                        makeBarTrace('Configured Memory', x, data.configured_memory, data.configured_memory_fmt, COLORS[2], hover('Configured Memory')),
+                        makeBarTrace('Actual Memory Used', x, data.actual_memory_used, data.actual_memory_used_fmt, COLORS[3], hover('Actual Memory')),
+                        makeBarTrace('Shuffle Read', x, data.shuffle_read, data.shuffle_read_fmt, COLORS[0], hover('Shuffle Read')),
+                        makeBarTrace('Shuffle Write', x, data.shuffle_write, data.shuffle_write_fmt, COLORS[1], hover('Shuffle Write'))
+                    ], { xaxis: { title: 'Executor ID' }, yaxis: { title: 'Bytes' } });
                 }
 
                 // Stage-Executor Shuffle 分布图表
@@ -1558,98 +1511,29 @@ class HTMLReportGenerator:
                     }
 
                     const traces = [];
-                    const colors = ['#3b82f6', '#8b5cf6', '#10b981', '#f59e0b', '#ef4444'];
-
-                    Object.keys(data).forEach((stageKey, index) => {
-                        const stageData = data[stageKey];
-                        const colorIndex = index % colors.length;
-
-                        // Shuffle Read trace
-                        traces.push({
-                            x: stageData.executor_ids,
-                            y: stageData.shuffle_read,
-                            name: `Stage ${stageData.stage_id} - Read`,
-                            type: 'bar',
-                            marker: {
-                                color: colors[colorIndex],
-                                opacity: 0.8
-                            },
-                            text: stageData.shuffle_read.map(bytes => formatBytes(bytes)),
-                            textposition: 'auto',
-                            hovertemplate: `<b>Stage ${stageData.stage_id}</b><br>${stageData.stage_name}<br>Executor: %{x}<br>Shuffle Read: %{text}<extra></extra>`
-                        });
-
-                        // Shuffle Write trace
-                        traces.push({
-                            x: stageData.executor_ids,
-                            y: stageData.shuffle_write,
-                            name: `Stage ${stageData.stage_id} - Write`,
-                            type: 'bar',
-                            marker: {
-                                color: colors[colorIndex],
-                                opacity: 0.5
-                            },
-                            text: stageData.shuffle_write.map(bytes => formatBytes(bytes)),
-                            textposition: 'auto',
-                            hovertemplate: `<b>Stage ${stageData.stage_id}</b><br>${stageData.stage_name}<br>Executor: %{x}<br>Shuffle Write: %{text}<extra></extra>`
-                        });
+                    Object.values(data).forEach((stageData, index) => {
+                        const color = COLORS[index % COLORS.length];
+                        const hover = label => `<b>Stage ${stageData.stage_id}</b><br>${stageData.stage_name}<br>Executor: %{x}<br>${label}: %{text}<extra></extra>`;
+                        traces.push(
+                            makeBarTrace(`Stage ${stageData.stage_id} - Read`, stageData.executor_ids, stageData.shuffle_read, stageData.shuffle_read_fmt, color, hover('Shuffle Read'), { opacity: 0.8 }),
+                            makeBarTrace(`Stage ${stageData.stage_id} - Write`, stageData.executor_ids, stageData.shuffle_write, stageData.shuffle_write_fmt, color, hover('Shuffle Write'), { opacity: 0.5 })
+                        );
                     });
 
-                    const layout = {
-                        paper_bgcolor: 'rgba(0,0,0,0)',
-                        plot_bgcolor: 'rgba(0,0,0,0)',
-                        font: { color: '#ffffff', family: 'JetBrains Mono' },
-                        xaxis: {
-                            gridcolor: '#333333',
-                            title: 'Executor ID'
-                        },
-                        yaxis: {
-                            gridcolor: '#333333',
-                            title: 'Shuffle Bytes'
-                        },
-                        barmode: 'group',
-                        margin: { t: 20, b: 50, l: 80, r: 20 },
-                        legend: {
-                            orientation: 'h',
-                            y: -0.2
-                        }
-                    };
-
-                    Plotly.newPlot('stageExecutorShuffleChart', traces, layout, {
-                        displayModeBar: false,
-                        responsive: true
-                    });
-
-                    // 图例交互：双击单选，单击切换
-                    let stageExecutorLastClick = 0;
-                    document.getElementById('stageExecutorShuffleChart').on('plotly_legendclick', function(data) {
-                        const chartDiv = document.getElementById('stageExecutorShuffleChart');
-                        const currentTime = new Date().getTime();
-                        const timeDiff = currentTime - stageExecutorLastClick;
-
-                        if (timeDiff < 400) {
-                            // 双击：单选模式，只显示点击的序列
-                            const update = {};
-                            chartDiv.data.forEach((trace, index) => {
-                                update[`visible[${index}]`] = index === data.curveNumber ? true : false;
-                            });
-                            Plotly.restyle('stageExecutorShuffleChart', update);
-                            stageExecutorLastClick = 0;
-                            return false;
-                        } else {
-                            // 单击：正常切换显示/隐藏
-                            stageExecutorLastClick = currentTime;
-                            return true;
-                        }
+                    createBarChart('stageExecutorShuffleChart', traces, {
+                        xaxis: { title: 'Executor ID' },
+                        yaxis: { title: 'Shuffle Bytes' },
+                        legend: { orientation: 'h', y: -0.2 }
                     });
                 }
 
                 // 数据倾斜分析图表
                 function createDataSkewChart(data) {
+                    const useGL = data.executor_ids.length > GL_THRESHOLD;
                     const trace = {
                         x: data.executor_ids,
                         y: data.skew_ratios,
-                        type: 'scatter',
+                        type: useGL ? 'scattergl' : 'scatter',
                         mode: 'markers+lines',
                         marker: {
                             size: 12,
@@ -1661,18 +1545,9 @@ class HTMLReportGenerator:
                         hovertemplate: '<b>Executor %{x}</b><br>Skew Ratio: %{y:.2f}<extra></extra>'
                     };
 
-                    const layout = {
-                        paper_bgcolor: 'rgba(0,0,0,0)',
-                        plot_bgcolor: 'rgba(0,0,0,0)',
-                        font: { color: '#ffffff', family: 'JetBrains Mono' },
-                        xaxis: {
-                            gridcolor: '#333333',
-                            title: 'Executor ID'
-                        },
-                        yaxis: {
-                            gridcolor: '#333333',
-                            title: 'Skew Ratio'
-                        },
+                    const layout = chartLayout(Object.assign(hoverLayout([trace]), {
+                        xaxis: { title: 'Executor ID' },
+                        yaxis: { title: 'Skew Ratio' },
                         shapes: [{
                             type: 'line',
                             x0: 0,
@@ -1689,62 +1564,66 @@ class HTMLReportGenerator:
                             text: 'Skew Threshold',
                             showarrow: false,
                             font: { color: '#ff6b35', size: 10 }
-                        }],
-                        margin: { t: 20, b: 50, l: 80, r: 20 }
-                    };
+                        }]
+                    }));
 
-                    Plotly.newPlot('dataSkewChart', [trace], layout, {
-                        displayModeBar: false,
-                        responsive: true
+                    plotChart('dataSkewChart', [trace], layout, {
+                        displayModeBar: false
                     });
                 }
 
-                // 格式化字节数
-                function formatBytes(bytes) {
-                    const sizes = ['B', 'KB', 'MB', 'GB', 'TB', 'PB'];
-                    if (bytes === 0 || bytes === null || bytes === undefined) return '0 B';
-
-                    // 确保bytes是正数
-                    const absBytes = Math.abs(Number(bytes));
-                    if (!isFinite(absBytes)) return '0 B';
-
-                    let i = Math.floor(Math.log(absBytes) / Math.log(1024));
-
-                    // 确保i在合理范围内
-                    if (isNaN(i) || i < 0) i = 0;
-                    if (i >= sizes.length) i = sizes.length - 1;
-
-                    const size = absBytes / Math.pow(1024, i);
-                    return Math.round(size * 100) / 100 + ' ' + sizes[i];
-                }
-
                 // 初始化图表数据
-                const chartData = {{chart_data}};
+                const chartData = ${chart_data};
 
-                // 创建所有图表
-                if (chartData.shuffle_stages) {
-                    createShuffleStagesChart(chartData.shuffle_stages);
-                }
-
-                if (chartData.executor_resources) {
-                    createExecutorResourceChart(chartData.executor_resources);
-                }
+                // 降采样提示：按 data-downsampled-note 指定的 payload 名只填写对应图表的提示
+                const downsampledNotes = chartData.downsampled_notes || {};
+                document.querySelectorAll('[data-downsampled-note]').forEach(el => {
+                    el.textContent = downsampledNotes[el.dataset.downsampledNote] || '';
+                });
 
-                if (chartData.stage_executor_shuffle) {
-                    createStageExecutorShuffleChart(chartData.stage_executor_shuffle);
+                // 图表进入视口（提前 200px）时才渲染，未出现的图表不占用初始化开销
+                function renderChart(el) {
+                    if (el.dataset.rendered) return;
+                    el.dataset.rendered = '1';
+                    const payload = chartData[el.dataset.payload];
+                    if (payload) {
+                        window[el.dataset.renderer](payload);
+                    }
                 }
 
-                if (chartData.data_skew) {
-                    createDataSkewChart(chartData.data_skew);
+                const chartDivs = document.querySelectorAll('[data-renderer]');
+                if ('IntersectionObserver' in window) {
+                    const io = new IntersectionObserver((entries) => entries.forEach(e => {
+                        if (e.isIntersecting) {
+                            renderChart(e.target);
+                            io.unobserve(e.target);
+                        }
+                    }), { rootMargin: '200px' });
+                    chartDivs.forEach(el => io.observe(el));
+                } else {
+                    chartDivs.forEach(renderChart);
                 }
 
                 // 表格排序功能
                 let sortDirection = {};
 
+                // 表头点击统一由 thead 上的一个监听器分发
+                const sortableHead = document.querySelector('.sortable-table thead');
+                if (sortableHead) {
+                    sortableHead.addEventListener('click', e => {
+                        const th = e.target.closest('th[data-sort-col]');
+                        if (th) sortTable(+th.dataset.sortCol);
+                    });
+                }
+
                 function sortTable(columnIndex) {
                     const table = document.querySelector('.sortable-table');
                     const tbody = table.querySelector('tbody');
-                    const rows = Array.from(tbody.querySelectorAll('tr'));
+                    // 报告中的表格内容不会变化，行数组只在首次排序时收集，之后原地排序复用
+                    if (!table._sortRows) {
+                        table._sortRows = Array.from(tbody.rows);
+                    }
+                    const rows = table._sortRows;
                     const headers = table.querySelectorAll('th.sortable');
 
                     // 切换排序方向
@@ -1767,33 +1646,32 @@ class HTMLReportGenerator:
 
                     // 排序数据
                     rows.sort((a, b) => {
-                        const aValue = a.cells[columnIndex].textContent.trim();
-                        const bValue = b.cells[columnIndex].textContent.trim();
+                        const aCell = a.cells[columnIndex];
+                        const bCell = b.cells[columnIndex];
 
                         // 处理不同数据类型
                         let comparison = 0;
 
-                        // 数字列（Executor ID, Cores, 内存大小, GC Time）
-                        if (columnIndex === 0 || columnIndex === 2 || columnIndex === 3 || columnIndex === 4 || columnIndex === 5 || columnIndex === 6) {
-                            // 提取数字部分进行比较
-                            const aNum = parseFloat(aValue.replace(/[^0-9.]/g, '')) || 0;
-                            const bNum = parseFloat(bValue.replace(/[^0-9.]/g, '')) || 0;
-                            comparison = aNum - bNum;
+                        // 数字列（Executor ID, Cores, 内存大小, GC Time）直接使用 data-sort 中的原始数值
+                        if (aCell.dataset.sort !== undefined) {
+                            comparison = (+aCell.dataset.sort || 0) - (+bCell.dataset.sort || 0);
                         } else {
                             // 字符串列（Host）
-                            comparison = aValue.localeCompare(bValue);
+                            comparison = aCell.textContent.trim().localeCompare(bCell.textContent.trim());
                         }
 
                         return newDirection === 'asc' ? comparison : -comparison;
                     });
 
-                    // 重新插入排序后的行
-                    rows.forEach(row => tbody.appendChild(row));
+                    // 排序后的行先放入 DocumentFragment，再一次性插回 tbody
+                    const frag = document.createDocumentFragment();
+                    rows.forEach(row => frag.appendChild(row));
+                    tbody.appendChild(frag);
 
-                    // 添加排序动画
-                    rows.forEach((row, index) => {
-                        row.style.animation = `tableRowSlide 0.3s ease ${index * 0.02}s both`;
-                    });
+                    // 通过切换 tbody 上的类重新播放排序动画，而不是逐行写入 style
+                    tbody.classList.remove('rows-sorted');
+                    void tbody.offsetWidth;
+                    tbody.classList.add('rows-sorted');
                 }
 
                 // 表格行动画
@@ -1809,6 +1687,10 @@ class HTMLReportGenerator:
                             transform: translateX(0);
                         }
                     }
+
+                    .rows-sorted tr {
+                        animation: tableRowSlide 0.3s ease both;
+                    }
                 `;
                 document.head.appendChild(style);
 
@@ -1830,97 +1712,200 @@ class HTMLReportGenerator:
         </html>
         """
 
-    async def generate_html_report(self, result: MatureAnalysisResult, html_report_host_address="http://localhost:7799", transport_mode="streamable-http") -> str:
-        """
-        生成 HTML 可视化报告并保存到文件
 
-        Args:
-            result: 分析结果
-            server_host: 服务器地址
-            server_port: 服务器端口
+def _split_template(template: str):
+    """按大块内容的插入点切分模板：<head> 为纯静态内容，只有仪表板片段包含占位符"""
+    head, sep, body = template.partition('</head>')
+    dashboard, _, rest = body.partition('${recommendations_html}')
+    after_recommendations, _, rest = rest.partition('${metrics_table}')
+    after_metrics_table, _, tail = rest.partition('${chart_data}')
+    return head + sep, Template(dashboard), after_recommendations, after_metrics_table, tail
 
-        Returns:
-            str: FastAPI 访问地址 (http://host:port/api/reports/filename.html)
-        """
-        # 格式化数据
-        formatted_data = self._format_data(result)
 
-        # 生成图表数据
-        chart_data = self._generate_chart_data(result)
+(
+    _HEAD_STATIC,
+    _DASHBOARD_TEMPLATE,
+    _AFTER_RECOMMENDATIONS_STATIC,
+    _AFTER_METRICS_TABLE_STATIC,
+    _TAIL_STATIC,
+) = _split_template(_HTML_TEMPLATE)
+
+
+@lru_cache(maxsize=2048)
+def _format_bytes(bytes_size: int) -> str:
+    """格式化字节数（executor 之间常有相同取值，结果按值缓存）"""
+    if bytes_size == 0:
+        return "0 B"
+
+    units = ['B', 'KB', 'MB', 'GB', 'TB']
+    size = float(bytes_size)
+
+    for unit in units:
+        if size < 1024.0:
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
 
-        # 生成建议 HTML
-        recommendations_html = self._generate_recommendations_html(result.optimization_recommendations)
+    return f"{size:.1f} PB"
 
-        # 生成指标表格
-        metrics_table = self._generate_metrics_table(result)
 
-        # 替换模板变量
-        html_content = self.template
+def _format_bytes_list(values: List[int]) -> List[str]:
+    """批量格式化字节数，供图表直接作为文字标签使用"""
+    return [_format_bytes(v) for v in values]
 
-        # 基础信息替换
-        html_content = html_content.replace('{{application_id}}', result.application_id)
-        html_content = html_content.replace('{{application_name}}', result.application_name)
-        html_content = html_content.replace('{{spark_version}}', result.spark_version)
-        html_content = html_content.replace('{{duration_formatted}}', formatted_data['duration'])
-        html_content = html_content.replace('{{total_jobs}}', str(result.total_jobs))
-        html_content = html_content.replace('{{successful_jobs}}', str(result.successful_jobs))
-        html_content = html_content.replace('{{failed_jobs}}', str(result.failed_jobs))
-        html_content = html_content.replace('{{success_rate}}', formatted_data['success_rate'])
-        html_content = html_content.replace('{{total_executors}}', str(result.total_executors))
 
-        # 性能指标替换
-        html_content = html_content.replace('{{peak_memory_formatted}}', formatted_data['peak_memory'])
-        html_content = html_content.replace('{{cpu_time_formatted}}', formatted_data['cpu_time'])
+# 单个图表中 executor 维度的最大展示点数，超出时按 LTTB 降采样
+_CHART_MAX_POINTS = 200
 
-        # Shuffle 指标替换
-        html_content = html_content.replace('{{shuffle_read_formatted}}', formatted_data['shuffle_read'])
-        html_content = html_content.replace('{{shuffle_write_formatted}}', formatted_data['shuffle_write'])
-        html_content = html_content.replace('{{shuffle_records_formatted}}', formatted_data['shuffle_records'])
-        html_content = html_content.replace('{{shuffle_efficiency}}', formatted_data['shuffle_efficiency'])
+
+def _dumps_chart_data(chart_data: Dict[str, Any]) -> str:
+    """序列化图表数据，优先使用 orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(chart_data, default=str, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(chart_data, default=str)
+
+
+def _lttb_indices(values: List[float], target: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的下标
+
+    首尾点固定保留，其余每个桶选取与前一选中点、后一桶均值构成三角形面积最大的点，
+    从而保留峰值和突变。
+    """
+    n = len(values)
+    if target >= n or target < 3:
+        return list(range(n))
+
+    y = np.asarray(values, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64)
+    bucket_size = (n - 2) / (target - 2)
+
+    indices = [0]
+    a = 0
+    for i in range(target - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices.append(a)
+
+    indices.append(n - 1)
+    return indices
+
+
+def _downsample_columns(columns: List[list], weights: List[float], target: int = _CHART_MAX_POINTS) -> List[list]:
+    """按 weights 的 LTTB 结果对多列同步降采样，保证各列仍按同一 executor 对齐"""
+    keep = _lttb_indices(weights, target)
+    return [[column[i] for i in keep] for column in columns]
+
+
+def _iter_report_parts(dashboard_values: Dict[str, Any], recommendations_html: str,
+                       metrics_table: str, chart_json: str) -> Iterator[str]:
+    """将已构建好的各区块按页面顺序与静态模板片段交替产出"""
+    yield _HEAD_STATIC
+    yield _DASHBOARD_TEMPLATE.safe_substitute(dashboard_values)
+    yield recommendations_html
+    yield _AFTER_RECOMMENDATIONS_STATIC
+    yield metrics_table
+    yield _AFTER_METRICS_TABLE_STATIC
+    yield chart_json
+    yield _TAIL_STATIC
+
+
+class HTMLReportGenerator:
+    """HTML 可视化报告生成器"""
+
+    async def _build_report_sections(self, result: MatureAnalysisResult) -> tuple:
+        """在线程池中并行构建各报告区块，避免 CPU 密集的拼接阻塞事件循环"""
+        return await asyncio.gather(
+            asyncio.to_thread(self._build_dashboard_values, result),
+            asyncio.to_thread(self._generate_recommendations_html, result.optimization_recommendations),
+            asyncio.to_thread(self._generate_metrics_table, result),
+            asyncio.to_thread(lambda: _dumps_chart_data(self._generate_chart_data(result)))
+        )
+
+    def _build_dashboard_values(self, result: MatureAnalysisResult) -> Dict[str, Any]:
+        """汇总仪表板模板的全部占位符取值"""
+        # 格式化数据
+        formatted_data = self._format_data(result)
 
         # Executor 配置信息
         executor_cores_config = result.spark_properties.get('spark.executor.cores', '2')
         executor_memory_config = result.spark_properties.get('spark.executor.memory', '1g')
-        html_content = html_content.replace('{{executor_cores_config}}', executor_cores_config)
-        html_content = html_content.replace('{{executor_memory_config}}', executor_memory_config)
 
         # Executor 内存分析
         if result.executors:
             # Total Memory = sum of configured executor memory only (不包含driver和overhead)
-            total_executor_memory = sum(exec.configured_memory_bytes for exec in result.executors)
-
             # Executor Overhead Memory = sum of executor overhead only (不包含driver overhead)
-            total_executor_overhead = sum(exec.overhead_memory for exec in result.executors)
+            total_executor_memory = 0
+            total_executor_overhead = 0
+            for exec in result.executors:
+                total_executor_memory += exec.configured_memory_bytes
+                total_executor_overhead += exec.overhead_memory
 
             # Single Executor Overhead Memory (固定值，不是平均值)
             single_executor_overhead = result.executors[0].overhead_memory if result.executors else 0
 
-            html_content = html_content.replace('{{executor_configured_memory_total}}', self._format_bytes(total_executor_memory))
-            html_content = html_content.replace('{{executor_total_memory}}', self._format_bytes(total_executor_memory))
-            html_content = html_content.replace('{{executor_overhead_memory}}', self._format_bytes(total_executor_overhead))
-            html_content = html_content.replace('{{avg_executor_overhead_memory}}', self._format_bytes(single_executor_overhead))
+            executor_total_memory = _format_bytes(total_executor_memory)
+            executor_overhead_memory = _format_bytes(total_executor_overhead)
+            avg_executor_overhead_memory = _format_bytes(single_executor_overhead)
         else:
-            html_content = html_content.replace('{{executor_configured_memory_total}}', 'N/A')
-            html_content = html_content.replace('{{executor_total_memory}}', 'N/A')
-            html_content = html_content.replace('{{executor_overhead_memory}}', 'N/A')
-            html_content = html_content.replace('{{avg_executor_overhead_memory}}', 'N/A')
+            executor_total_memory = 'N/A'
+            executor_overhead_memory = 'N/A'
+            avg_executor_overhead_memory = 'N/A'
 
-        # Driver 指标替换
+        # Driver 指标
         if result.driver_metrics:
-            html_content = html_content.replace('{{driver_cores}}', str(result.driver_metrics.cores))
-            html_content = html_content.replace('{{driver_memory}}', result.driver_metrics.memory)
-            html_content = html_content.replace('{{driver_overhead_memory_formatted}}', self._format_bytes(result.driver_metrics.overhead_memory))
-            html_content = html_content.replace('{{driver_gc_time_formatted}}', f"{result.driver_metrics.total_gc_time/1000:.1f}s")
+            driver_cores = str(result.driver_metrics.cores)
+            driver_memory = result.driver_metrics.memory
+            driver_overhead_memory_formatted = _format_bytes(result.driver_metrics.overhead_memory)
+            driver_gc_time_formatted = f"{result.driver_metrics.total_gc_time/1000:.1f}s"
         else:
-            html_content = html_content.replace('{{driver_cores}}', 'N/A')
-            html_content = html_content.replace('{{driver_memory}}', 'N/A')
-            html_content = html_content.replace('{{driver_overhead_memory_formatted}}', 'N/A')
-            html_content = html_content.replace('{{driver_gc_time_formatted}}', 'N/A')
+            driver_cores = 'N/A'
+            driver_memory = 'N/A'
+            driver_overhead_memory_formatted = 'N/A'
+            driver_gc_time_formatted = 'N/A'
+
+        return {
+            'application_id': result.application_id,
+            'application_name': result.application_name,
+            'spark_version': result.spark_version,
+            'duration_formatted': formatted_data['duration'],
+            'total_jobs': result.total_jobs,
+            'success_rate': formatted_data['success_rate'],
+            'total_executors': result.total_executors,
+            'peak_memory_formatted': formatted_data['peak_memory'],
+            'shuffle_read_formatted': formatted_data['shuffle_read'],
+            'shuffle_write_formatted': formatted_data['shuffle_write'],
+            'shuffle_records_formatted': formatted_data['shuffle_records'],
+            'shuffle_efficiency': formatted_data['shuffle_efficiency'],
+            'executor_cores_config': executor_cores_config,
+            'executor_memory_config': executor_memory_config,
+            'executor_total_memory': executor_total_memory,
+            'executor_overhead_memory': executor_overhead_memory,
+            'avg_executor_overhead_memory': avg_executor_overhead_memory,
+            'driver_cores': driver_cores,
+            'driver_memory': driver_memory,
+            'driver_overhead_memory_formatted': driver_overhead_memory_formatted,
+            'driver_gc_time_formatted': driver_gc_time_formatted,
+        }
 
-        # 其他内容替换
-        html_content = html_content.replace('{{recommendations_html}}', recommendations_html)
-        html_content = html_content.replace('{{metrics_table}}', metrics_table)
-        html_content = html_content.replace('{{chart_data}}', json.dumps(chart_data))
+    async def generate_html_report(self, result: MatureAnalysisResult, html_report_host_address="http://localhost:7799", transport_mode="streamable-http") -> str:
+        """
+        生成 HTML 可视化报告并保存到文件
+
+        Args:
+            result: 分析结果
+            server_host: 服务器地址
+            server_port: 服务器端口
+
+        Returns:
+            str: FastAPI 访问地址 (http://host:port/api/reports/filename.html)
+        """
+        sections = await self._build_report_sections(result)
 
         # 生成文件名（使用应用ID和时间戳）
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1934,9 +1919,25 @@ class HTMLReportGenerator:
         file_path = report_dir / filename
         # 绝对路径
         absolute_path = file_path.resolve()
-        # 异步写入文件
-        async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
-            await f.write(html_content)
+        # 按片段异步写入临时文件，避免在内存中拼接完整报告；写完后再替换为正式文件。
+        # 同时增量写出 gzip 预压缩副本，供 HTTP 接口直接返回压缩内容
+        gz_path = file_path.with_name(filename + ".gz")
+        tmp_path = file_path.with_name(filename + ".tmp")
+        gz_tmp_path = gz_path.with_name(gz_path.name + ".tmp")
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        try:
+            async with aiofiles.open(tmp_path, 'w', encoding='utf-8') as f, \
+                    aiofiles.open(gz_tmp_path, 'wb') as gz:
+                for chunk in _iter_report_parts(*sections):
+                    await f.write(chunk)
+                    await gz.write(compressor.compress(chunk.encode('utf-8')))
+                await gz.write(compressor.flush())
+            os.replace(tmp_path, file_path)
+            os.replace(gz_tmp_path, gz_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            gz_tmp_path.unlink(missing_ok=True)
+            raise
         
         if  transport_mode=="streamable-http":
             # 返回 resource URL
@@ -1947,6 +1948,8 @@ class HTMLReportGenerator:
     def _format_data(self, result: MatureAnalysisResult) -> Dict[str, str]:
         """格式化数据用于显示"""
         formatted = {}
+        sa = result.shuffle_analysis
+        pm = result.performance_metrics
 
         # 格式化持续时间
         if result.duration_ms:
@@ -1968,99 +1971,139 @@ class HTMLReportGenerator:
             formatted['success_rate'] = "0"
 
         # 格式化内存
-        formatted['peak_memory'] = self._format_bytes(result.performance_metrics.peak_execution_memory)
+        formatted['peak_memory'] = _format_bytes(pm.peak_execution_memory)
 
         # 格式化时间
-        formatted['cpu_time'] = f"{result.performance_metrics.total_cpu_time_ms/1000:.1f}s"
+        formatted['cpu_time'] = f"{pm.total_cpu_time_ms/1000:.1f}s"
 
         # 格式化 Shuffle
-        formatted['shuffle_read'] = self._format_bytes(result.shuffle_analysis.total_shuffle_read_bytes)
-        formatted['shuffle_write'] = self._format_bytes(result.shuffle_analysis.total_shuffle_write_bytes)
+        formatted['shuffle_read'] = _format_bytes(sa.total_shuffle_read_bytes)
+        formatted['shuffle_write'] = _format_bytes(sa.total_shuffle_write_bytes)
 
         # 格式化记录数
-        total_records = result.shuffle_analysis.total_shuffle_read_records + result.shuffle_analysis.total_shuffle_write_records
+        total_records = sa.total_shuffle_read_records + sa.total_shuffle_write_records
         formatted['shuffle_records'] = f"{total_records:,}"
 
         # Shuffle 效率
-        if result.shuffle_analysis.total_shuffle_write_bytes > 0:
-            ratio = result.shuffle_analysis.total_shuffle_read_bytes / result.shuffle_analysis.total_shuffle_write_bytes
+        if sa.total_shuffle_write_bytes > 0:
+            ratio = sa.total_shuffle_read_bytes / sa.total_shuffle_write_bytes
             formatted['shuffle_efficiency'] = f"{ratio:.2f}x"
         else:
             formatted['shuffle_efficiency'] = "N/A"
 
         return formatted
 
-    def _format_bytes(self, bytes_size: int) -> str:
-        """格式化字节数"""
-        if bytes_size == 0:
-            return "0 B"
-
-        units = ['B', 'KB', 'MB', 'GB', 'TB']
-        size = float(bytes_size)
-
-        for unit in units:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-
-        return f"{size:.1f} PB"
-
     def _generate_chart_data(self, result: MatureAnalysisResult) -> Dict[str, Any]:
         """生成图表数据"""
         chart_data = {}
+        # 各图表 payload 名 -> 降采样前的 executor 数，只为实际降采样的图表生成提示
+        downsampled_from = {}
+        sa = result.shuffle_analysis
 
         # Shuffle Stage 数据 - 分离读写
-        if result.shuffle_analysis.most_shuffle_intensive_stages:
-            stages = result.shuffle_analysis.most_shuffle_intensive_stages[:10]  # 取前10个
+        if sa.most_shuffle_intensive_stages:
+            stage_names, stage_reads, stage_writes = [], [], []
+            for stage in sa.most_shuffle_intensive_stages[:10]:  # 取前10个
+                stage_names.append(f"Stage {stage['stage_id']}")
+                stage_reads.append(stage['shuffle_read_bytes'])
+                stage_writes.append(stage['shuffle_write_bytes'])
             chart_data['shuffle_stages'] = {
-                'stage_names': [f"Stage {stage['stage_id']}" for stage in stages],
-                'shuffle_read_bytes': [stage['shuffle_read_bytes'] for stage in stages],
-                'shuffle_write_bytes': [stage['shuffle_write_bytes'] for stage in stages]
+                'stage_names': stage_names,
+                'shuffle_read_bytes': stage_reads,
+                'shuffle_write_bytes': stage_writes,
+                'shuffle_read_bytes_fmt': _format_bytes_list(stage_reads),
+                'shuffle_write_bytes_fmt': _format_bytes_list(stage_writes)
             }
 
-        # Executor 资源数据 - 统一使用字节单位，由JavaScript formatBytes处理
+        # Executor 资源数据 - 数值保持字节单位，文字标签在服务端格式化
         if result.executors:
+            # 单次遍历 executor 列表，同时填充各列
+            ids, configured, actual, reads, writes = [], [], [], [], []
+            for exec in result.executors:
+                ids.append(exec.executor_id)
+                configured.append(exec.configured_memory_bytes)  # 保持字节单位
+                actual.append(exec.max_memory)  # 保持字节单位
+                reads.append(exec.total_shuffle_read)
+                writes.append(exec.total_shuffle_write)
+
+            # executor 过多时按 shuffle 总量降采样，限制前端渲染的数据量
+            if len(ids) > _CHART_MAX_POINTS:
+                downsampled_from['executor_resources'] = len(ids)
+                ids, configured, actual, reads, writes = _downsample_columns(
+                    [ids, configured, actual, reads, writes],
+                    [r + w for r, w in zip(reads, writes)]
+                )
+
             chart_data['executor_resources'] = {
-                'executor_ids': [exec.executor_id for exec in result.executors],
-                'configured_memory': [exec.configured_memory_bytes for exec in result.executors],  # 保持字节单位
-                'actual_memory_used': [exec.max_memory for exec in result.executors],  # 保持字节单位
-                'shuffle_read': [exec.total_shuffle_read for exec in result.executors],
-                'shuffle_write': [exec.total_shuffle_write for exec in result.executors]
+                'executor_ids': ids,
+                'configured_memory': configured,
+                'actual_memory_used': actual,
+                'shuffle_read': reads,
+                'shuffle_write': writes,
+                'configured_memory_fmt': _format_bytes_list(configured),
+                'actual_memory_used_fmt': _format_bytes_list(actual),
+                'shuffle_read_fmt': _format_bytes_list(reads),
+                'shuffle_write_fmt': _format_bytes_list(writes)
             }
 
         # 按 Stage 的 Executor Shuffle 使用分布 - 只取有 shuffle 数据的 stage
         stage_executor_data = {}
-        if result.shuffle_analysis.stage_shuffle_metrics:
-            # 过滤有 shuffle 数据的 stage 并按 shuffle 总量排序
-            stages_with_shuffle = []
-            for stage_metric in result.shuffle_analysis.stage_shuffle_metrics:
-                if stage_metric.executor_shuffle_metrics:
-                    total_shuffle = stage_metric.shuffle_read_bytes + stage_metric.shuffle_write_bytes
-                    if total_shuffle > 0:  # 只取有 shuffle 数据的 stage
-                        stages_with_shuffle.append((stage_metric, total_shuffle))
-
-            # 按 shuffle 总量排序，取前5个
-            stages_with_shuffle.sort(key=lambda x: x[1], reverse=True)
-            for stage_metric, _ in stages_with_shuffle[:5]:
+        if sa.stage_shuffle_metrics:
+            # 过滤有 shuffle 数据的 stage，按 shuffle 总量取前5个（无需完整排序）
+            top_stages = heapq.nlargest(
+                5,
+                (
+                    (stage_metric, stage_metric.shuffle_read_bytes + stage_metric.shuffle_write_bytes)
+                    for stage_metric in sa.stage_shuffle_metrics
+                    if stage_metric.executor_shuffle_metrics
+                ),
+                key=lambda x: x[1]
+            )
+            for stage_metric, total_shuffle in top_stages:
+                if total_shuffle <= 0:  # 只取有 shuffle 数据的 stage
+                    break
+                executor_ids, reads, writes = [], [], []
+                for exec_id, metrics in stage_metric.executor_shuffle_metrics.items():
+                    executor_ids.append(exec_id)
+                    reads.append(metrics['read_bytes'])
+                    writes.append(metrics['write_bytes'])
+
+                if len(executor_ids) > _CHART_MAX_POINTS:
+                    downsampled_from['stage_executor_shuffle'] = max(
+                        downsampled_from.get('stage_executor_shuffle', 0), len(executor_ids)
+                    )
+                    executor_ids, reads, writes = _downsample_columns(
+                        [executor_ids, reads, writes],
+                        [r + w for r, w in zip(reads, writes)]
+                    )
+
                 stage_key = f"stage_{stage_metric.stage_id}"
                 stage_executor_data[stage_key] = {
                     'stage_id': stage_metric.stage_id,
                     'stage_name': stage_metric.stage_name,
-                    'executor_ids': list(stage_metric.executor_shuffle_metrics.keys()),
-                    'shuffle_read': [metrics['read_bytes'] for metrics in stage_metric.executor_shuffle_metrics.values()],
-                    'shuffle_write': [metrics['write_bytes'] for metrics in stage_metric.executor_shuffle_metrics.values()]
+                    'executor_ids': executor_ids,
+                    'shuffle_read': reads,
+                    'shuffle_write': writes,
+                    'shuffle_read_fmt': _format_bytes_list(reads),
+                    'shuffle_write_fmt': _format_bytes_list(writes)
                 }
 
         chart_data['stage_executor_shuffle'] = stage_executor_data
 
+        if downsampled_from:
+            chart_data['downsampled_notes'] = {
+                payload: f"共 {count} 个 executor，图表按 LTTB 降采样展示 {_CHART_MAX_POINTS} 个代表点"
+                for payload, count in downsampled_from.items()
+            }
+
         # 数据倾斜数据
-        skew_analysis = result.shuffle_analysis.data_skew_analysis
+        skew_analysis = sa.data_skew_analysis
         if skew_analysis.get('stages_with_skew'):
             # 使用第一个有倾斜的 stage 的数据
             first_skewed_stage = skew_analysis['stages_with_skew'][0]
-            if result.shuffle_analysis.stage_shuffle_metrics:
+            if sa.stage_shuffle_metrics:
                 stage_metrics = next(
-                    (s for s in result.shuffle_analysis.stage_shuffle_metrics
+                    (s for s in sa.stage_shuffle_metrics
                      if s.stage_id == first_skewed_stage['stage_id']),
                     None
                 )
@@ -2071,13 +2114,12 @@ class HTMLReportGenerator:
                         executor_ids.append(exec_id)
                         executor_reads.append(metrics['read_bytes'])
 
-                    if executor_reads and max(executor_reads) > 0:
-                        avg_read = sum(executor_reads) / len(executor_reads)
-                        skew_ratios = [read / avg_read if avg_read > 0 else 1 for read in executor_reads]
-
+                    # 向量化计算各 executor 读取量相对均值的倍数
+                    reads = np.fromiter(executor_reads, dtype=np.float64, count=len(executor_reads))
+                    if reads.size and reads.max() > 0:
                         chart_data['data_skew'] = {
                             'executor_ids': executor_ids,
-                            'skew_ratios': skew_ratios
+                            'skew_ratios': (reads / reads.mean()).tolist()
                         }
 
         # 如果没有倾斜数据，创建默认数据
@@ -2137,34 +2179,36 @@ class HTMLReportGenerator:
         if not result.executors:
             return "<p>无 Executor 数据</p>"
 
-        html = """
+        parts = ["""
         <table class="data-table sortable-table">
             <thead>
                 <tr>
-                    <th class="sortable" onclick="sortTable(0)">Executor ID <span class="sort-indicator">⇅</span></th>
-                    <th class="sortable" onclick="sortTable(1)">Host <span class="sort-indicator">⇅</span></th>
-                    <th class="sortable" onclick="sortTable(2)">Cores <span class="sort-indicator">⇅</span></th>
-                    <th class="sortable" onclick="sortTable(3)">Overhead Memory <span class="sort-indicator">⇅</span></th>
-                    <th class="sortable" onclick="sortTable(4)">Shuffle Read <span class="sort-indicator">⇅</span></th>
-                    <th class="sortable" onclick="sortTable(5)">Shuffle Write <span class="sort-indicator">⇅</span></th>
-                    <th class="sortable" onclick="sortTable(6)">GC Time <span class="sort-indicator">⇅</span></th>
+                    <th class="sortable" data-sort-col="0">Executor ID <span class="sort-indicator">⇅</span></th>
+                    <th class="sortable" data-sort-col="1">Host <span class="sort-indicator">⇅</span></th>
+                    <th class="sortable" data-sort-col="2">Cores <span class="sort-indicator">⇅</span></th>
+                    <th class="sortable" data-sort-col="3">Overhead Memory <span class="sort-indicator">⇅</span></th>
+                    <th class="sortable" data-sort-col="4">Shuffle Read <span class="sort-indicator">⇅</span></th>
+                    <th class="sortable" data-sort-col="5">Shuffle Write <span class="sort-indicator">⇅</span></th>
+                    <th class="sortable" data-sort-col="6">GC Time <span class="sort-indicator">⇅</span></th>
                 </tr>
             </thead>
             <tbody>
-        """
+        """]
 
+        # 数值列通过 data-sort 携带原始数值，前端排序时无需再解析显示文本
         for executor in result.executors:
-            html += f"""
+            id_sort = executor.executor_id if executor.executor_id.isdigit() else 0
+            parts.append(f"""
             <tr>
-                <td class="id-cell">{executor.executor_id}</td>
+                <td class="id-cell" data-sort="{id_sort}">{executor.executor_id}</td>
                 <td class="host-cell" title="{executor.host}">{executor.host}</td>
-                <td class="cores-cell">{executor.cores}</td>
-                <td class="memory-cell">{self._format_bytes(executor.overhead_memory)}</td>
-                <td class="memory-cell">{self._format_bytes(executor.total_shuffle_read)}</td>
-                <td class="memory-cell">{self._format_bytes(executor.total_shuffle_write)}</td>
-                <td>{executor.total_gc_time / 1000:.1f}s</td>
+                <td class="cores-cell" data-sort="{executor.cores}">{executor.cores}</td>
+                <td class="memory-cell" data-sort="{executor.overhead_memory}">{_format_bytes(executor.overhead_memory)}</td>
+                <td class="memory-cell" data-sort="{executor.total_shuffle_read}">{_format_bytes(executor.total_shuffle_read)}</td>
+                <td class="memory-cell" data-sort="{executor.total_shuffle_write}">{_format_bytes(executor.total_shuffle_write)}</td>
+                <td data-sort="{executor.total_gc_time}">{executor.total_gc_time / 1000:.1f}s</td>
             </tr>
-            """
+            """)
 
-        html += "</tbody></table>"
-        return html
\ No newline at end of file
+        parts.append("</tbody></table>")
+        return "".join(parts)
\ No newline at end of file
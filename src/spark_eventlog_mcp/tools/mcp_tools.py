@@ -3,15 +3,17 @@ MCP Tools 实现模块
 包含所有 MCP 工具的具体实现逻辑
 """
 
-from typing import Dict, Any, Optional
-from datetime import datetime
+import time
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
 
 from ..models.schemas import (
     ParseEventLogInput, AnalyzePerformanceInput,
     GetOptimizationSuggestionsInput, DataSource, AnalysisConfig
 )
 from ..core.mature_data_loader import MatureDataLoader
-from ..tools.mature_analyzer import MatureSparkEventLogAnalyzer
+from ..tools.mature_analyzer import MatureSparkEventLogAnalyzer, flatten_optimization_suggestions
 from ..tools.mature_report_generator import HTMLReportGenerator
 from ..models.mature_models import MatureAnalysisResult
 from ..utils.helpers import setup_logging, load_config_from_env, create_error_response, create_success_response
@@ -22,17 +24,62 @@ logger = setup_logging(config["log_level"])
 
 # Initialize components
 mature_data_loader = MatureDataLoader(config)
-analyzer = MatureSparkEventLogAnalyzer()
 report_generator = HTMLReportGenerator()
 
+# generate_report_tool 使用的固定输入，模块加载时构建一次（共享实例，不要修改）
+_DEFAULT_REPORT_ANALYSIS_CONFIG = AnalysisConfig(
+    analysis_depth="detailed",
+    include_shuffle_analysis=True,
+    include_resource_analysis=True,
+    include_task_analysis=True,
+    include_optimization_suggestions=True
+)
+_ALL_SUGGESTIONS_INPUT = GetOptimizationSuggestionsInput(
+    focus_areas=[],  # Get all suggestions
+    priority_filter=None  # No priority filter
+)
+
+
+@dataclass(slots=True)
+class Session:
+    """单个 MCP 会话的分析状态：只保存分析结果（其中包含分析摘要和优化建议），不持有分析器"""
+    analysis: Optional[MatureAnalysisResult] = None
+    data_source: Optional[DataSource] = None
+
+
+# 会话状态：按 MCP 会话 ID 隔离，并发请求互不覆盖；
+# 客户端断开后不会主动清理，因此按最近使用顺序最多保留 _MAX_SESSIONS 个，超出时淘汰最久未用的会话
+_DEFAULT_SESSION_ID = "default"
+_MAX_SESSIONS = 32
+sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+
+def get_session(session_id: Optional[str] = None) -> Session:
+    """获取（必要时创建）指定会话；未提供会话 ID 时使用默认会话"""
+    key = session_id or _DEFAULT_SESSION_ID
+    session = sessions.get(key)
+    if session is None:
+        session = sessions[key] = Session()
+        if len(sessions) > _MAX_SESSIONS:
+            sessions.popitem(last=False)
+    else:
+        sessions.move_to_end(key)
+    return session
+
+
 # Server state
-_current_analysis: Optional[MatureAnalysisResult] = None
-_current_data_source: Optional[DataSource] = None
 _server_host: str = "localhost"
 _server_port: int = 7799
 _transport_mode: str = "streamable-http"
 
 
+def _iso_now() -> str:
+    """元数据用的 UTC ISO-8601 时间戳：time_ns + gmtime，避免构造 datetime 对象"""
+    ns = time.time_ns()
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{remainder // 1000:06d}Z"
+
+
 def set_server_config(host: str, port: int, transport_mode: str):
     """设置服务器配置"""
     global _server_host, _server_port, _transport_mode
@@ -41,7 +88,7 @@ def set_server_config(host: str, port: int, transport_mode: str):
     _transport_mode = transport_mode
 
 
-async def parse_eventlog(input_data: ParseEventLogInput) -> Dict[str, Any]:
+async def parse_eventlog(input_data: ParseEventLogInput, session_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Parse Spark event logs from various data sources (S3, URL, local files)
 
@@ -50,14 +97,15 @@ async def parse_eventlog(input_data: ParseEventLogInput) -> Dict[str, Any]:
 
     Args:
         input_data: Configuration specifying the data source
+        session_id: MCP session the data source is stored in
 
     Returns:
         Parsing results with summary statistics
     """
-    global _current_data_source
+    session = get_session(session_id)
 
     try:
-        logger.info(f"Parsing event logs from {input_data.data_source.source_type}: {input_data.data_source.path}")
+        logger.info("Parsing event logs from %s: %s", input_data.data_source.source_type, input_data.data_source.path)
 
         # Validate data source first
         validation_result = await mature_data_loader.validate_data_source(input_data.data_source)
@@ -70,7 +118,7 @@ async def parse_eventlog(input_data: ParseEventLogInput) -> Dict[str, Any]:
             )
 
         # Store current data source
-        _current_data_source = input_data.data_source
+        session.data_source = input_data.data_source
 
         # Generate summary
         summary = {
@@ -83,7 +131,7 @@ async def parse_eventlog(input_data: ParseEventLogInput) -> Dict[str, Any]:
         if validation_result["warnings"]:
             summary["warnings"] = validation_result["warnings"]
 
-        logger.info(f"Successfully validated data source: {input_data.data_source.path}")
+        logger.info("Successfully validated data source: %s", input_data.data_source.path)
 
         return create_success_response(
             {
@@ -97,14 +145,14 @@ async def parse_eventlog(input_data: ParseEventLogInput) -> Dict[str, Any]:
         )
 
     except Exception as e:
-        logger.error(f"Failed to parse event logs: {str(e)}")
+        logger.error("Failed to parse event logs: %s", e)
         return create_error_response(
             "ParseError",
             f"Failed to parse event logs: {str(e)}"
         )
 
 
-async def analyze_performance(input_data: AnalyzePerformanceInput) -> Dict[str, Any]:
+async def analyze_performance(input_data: AnalyzePerformanceInput, session_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Perform comprehensive performance analysis of Spark event logs
 
@@ -113,75 +161,90 @@ async def analyze_performance(input_data: AnalyzePerformanceInput) -> Dict[str,
 
     Args:
         input_data: Analysis configuration and optional data source
+        session_id: MCP session the analysis result is stored in
 
     Returns:
         Complete analysis results with metrics and insights
     """
-    global _current_analysis, _current_data_source
+    response, _ = await _run_analysis(input_data, session_id)
+    return response
+
+
+async def _run_analysis(input_data: AnalyzePerformanceInput,
+                        session_id: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[MatureAnalysisResult]]:
+    """执行 analyze_performance，并把本次的分析结果直接返回给进程内调用方（失败时为 None），
+    调用方无需再从会话读取，避免同一会话内的并发分析互相覆盖"""
+    session = get_session(session_id)
 
     try:
         # Use provided data source or current one
-        data_source = input_data.data_source or _current_data_source
+        data_source = input_data.data_source or session.data_source
 
         if not data_source:
             return create_error_response(
                 "ConfigurationError",
                 "No data source available. Please run parse_eventlog first or provide a data source."
-            )
+            ), None
 
-        logger.info(f"Starting performance analysis with config: {input_data.analysis_config.analysis_depth}")
-
-        # Load event logs using mature data loader
-        if input_data.data_source:
-            if data_source.source_type == "s3":
-                event_logs_data = await mature_data_loader.load_from_s3(data_source.path)
-            elif data_source.source_type == "url":
-                event_logs_data = await mature_data_loader.load_from_url(data_source.path)
-            elif data_source.source_type == "local":
-                event_logs_data = await mature_data_loader.load_from_upload(data_source.path)
-            else:
-                return create_error_response(
-                    "DataError",
-                    f"Unsupported data source type: {data_source.source_type}"
-                )
-        else:
+        logger.info("Starting performance analysis with config: %s", input_data.analysis_config.analysis_depth)
+
+        if not input_data.data_source:
             return create_error_response(
                 "DataError",
                 "Please provide a data_source parameter for analysis."
-            )
+            ), None
 
-        # Perform analysis using mature analyzer
-        analysis_result = analyzer.analyze(event_logs_data)
+        if data_source.source_type not in ("s3", "url", "local"):
+            return create_error_response(
+                "DataError",
+                f"Unsupported data source type: {data_source.source_type}"
+            ), None
+
+        # Validate and open the event log stream in one step, then feed it straight into the analyzer
+        validation_result, event_lines = await mature_data_loader.open_stream(data_source)
+        if event_lines is None:
+            return create_error_response(
+                "ValidationError",
+                f"Invalid data source: {validation_result['error_message']}",
+                validation_result
+            ), None
+
+        session.data_source = data_source
+        # 分析器状态跨越 await，每次分析使用独立实例，并发调用（包括同一会话内）互不干扰
+        analyzer = MatureSparkEventLogAnalyzer()
+        analysis_result = await analyzer.analyze_stream(event_lines)
 
         # Store current analysis
-        _current_analysis = analysis_result
+        session.analysis = analysis_result
 
         # Create response with summary
-        summary = analyzer.get_analysis_summary()
+        summary = analysis_result.analysis_summary
 
-        logger.info(f"Analysis completed for application: {analysis_result.application_id}")
+        logger.info("Analysis completed for application: %s", analysis_result.application_id)
 
         return create_success_response(
             {
                 "analysis_complete": True,
-                "analysis_result": analysis_result.model_dump(),
+                # 完整结果的 model_dump 会递归遍历所有作业/Executor，只在调用方明确需要时生成
+                "analysis_result": analysis_result.model_dump() if input_data.include_full_result else None,
                 "summary": summary
             },
             {
                 "analysis_timestamp": analysis_result.analysis_timestamp.isoformat(),
                 "config_used": input_data.analysis_config.model_dump()
             }
-        )
+        ), analysis_result
 
     except Exception as e:
-        logger.error(f"Performance analysis failed: {str(e)}")
+        logger.error("Performance analysis failed: %s", e)
         return create_error_response(
             "AnalysisError",
             f"Performance analysis failed: {str(e)}"
-        )
+        ), None
 
 
-async def generate_report_tool(path: str, html_report_host_address="http://localhost:7799") -> Dict[str, Any]:
+async def generate_report_tool(path: str, html_report_host_address="http://localhost:7799",
+                               session_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate comprehensive Spark event log analysis reports from S3 or URL paths
 
@@ -197,93 +260,64 @@ async def generate_report_tool(path: str, html_report_host_address="http://local
               Examples:
               - "s3://my-bucket/spark-logs/application-123/"
               - "https://example.com/spark-eventlogs.zip"
+        session_id: MCP session the analysis result is stored in
 
     Returns:
         Complete analysis report with metadata, visualization URL, and optimization suggestions
     """
-    global _current_analysis, _current_data_source
-
     try:
-        logger.info(f"Starting end-to-end report generation for path: {path}")
-
         # Phase 1: Auto-detect path type and create data source
         if path.startswith('s3://'):
             data_source = DataSource(source_type="s3", path=path)
-            logger.info(f"Detected S3 path: {path}")
         elif path.startswith(('http://', 'https://')):
             data_source = DataSource(source_type="url", path=path)
-            logger.info(f"Detected URL path: {path}")
         else:
             return create_error_response(
                 "InvalidPath",
                 f"Unsupported path format. Path must start with 's3://' or 'http(s)://'. Got: {path}"
             )
 
-        # Phase 2: Data Parsing
-        logger.info(f"Starting data parsing from {data_source.source_type}")
-        parse_input = ParseEventLogInput(data_source=data_source)
-        parse_response = await parse_eventlog(parse_input)
-
-        if not parse_response.get("success", False):
-            return create_error_response(
-                "ParseError",
-                f"Data parsing failed: {parse_response.get('message', 'Unknown error')}"
-            )
-
-        # Phase 3: Performance Analysis
-        logger.info("Starting performance analysis")
-        analysis_config = AnalysisConfig(
-            analysis_depth="detailed",
-            include_shuffle_analysis=True,
-            include_resource_analysis=True,
-            include_task_analysis=True,
-            include_optimization_suggestions=True
-        )
+        logger.info("Starting end-to-end report generation for %s path: %s", data_source.source_type.upper(), path)
 
+        # Phase 2 + 3: Data Parsing and Performance Analysis
+        # analyze_performance validates the source and streams it once, so no separate parse_eventlog pass
         analysis_input = AnalyzePerformanceInput(
-            analysis_config=analysis_config,
-            data_source=data_source
+            analysis_config=_DEFAULT_REPORT_ANALYSIS_CONFIG,
+            data_source=data_source,
+            include_full_result=False  # 报告直接使用本次返回的分析结果，无需序列化副本
         )
 
-        analysis_response = await analyze_performance(analysis_input)
+        # 使用本次调用自己的分析结果，而不是事后读取会话（同一会话内并发生成报告时会被覆盖）
+        analysis_response, analysis_result = await _run_analysis(analysis_input, session_id)
 
         if not analysis_response.get("success", False):
+            error = analysis_response.get("error", {})
+            if error.get("type") == "ValidationError":
+                return create_error_response(
+                    "ParseError",
+                    f"Data parsing failed: {error.get('message', 'Unknown error')}"
+                )
             return create_error_response(
                 "AnalysisError",
-                f"Performance analysis failed: {analysis_response.get('message', 'Unknown error')}"
+                f"Performance analysis failed: {error.get('message', 'Unknown error')}"
             )
 
-        # Get analysis result from current session
-        analysis_result = _current_analysis
-
-        if not analysis_result:
+        if analysis_result is None:
             return create_error_response(
                 "AnalysisError",
                 "Analysis completed but no result available"
             )
 
-        logger.info(f"Performance analysis completed for application: {analysis_result.application_id}")
-
         # Phase 4: Optimization Suggestions Extraction
-        logger.info("Extracting optimization suggestions")
-
-        suggestions_input = GetOptimizationSuggestionsInput(
-            focus_areas=[],  # Get all suggestions
-            priority_filter=None  # No priority filter
-        )
-
-        suggestions_response = await get_optimization_suggestions(suggestions_input)
+        suggestions_response = _optimization_suggestions_response(analysis_result, _ALL_SUGGESTIONS_INPUT)
         optimization_suggestions = []
 
         if suggestions_response.get("success", False):
             optimization_suggestions = suggestions_response.get("data", {}).get("suggestions", [])
-            logger.info(f"Retrieved {len(optimization_suggestions)} optimization suggestions")
         else:
-            logger.warning(f"Failed to get optimization suggestions: {suggestions_response.get('message', 'Unknown error')}")
+            logger.warning("Failed to get optimization suggestions: %s", suggestions_response.get('message', 'Unknown error'))
 
         # Phase 5: HTML Report Generation
-        logger.info("Generating HTML report")
-
         report_address = await report_generator.generate_html_report(
             analysis_result,
             html_report_host_address=html_report_host_address,
@@ -330,8 +364,8 @@ async def generate_report_tool(path: str, html_report_host_address="http://local
             "analysis_timestamp": analysis_result.analysis_timestamp.isoformat(),
             "total_optimization_suggestions": len(optimization_suggestions),
             "analysis_summary": {
-                "total_jobs": len(analysis_result.jobs),
-                "total_tasks": sum(job.num_tasks for job in analysis_result.jobs),
+                "total_jobs": analysis_result.total_jobs,
+                "total_tasks": analysis_result.total_tasks,
                 "total_duration_ms": analysis_result.duration_ms,
                 "successful_jobs": analysis_result.successful_jobs,
                 "failed_jobs": analysis_result.failed_jobs,
@@ -341,29 +375,27 @@ async def generate_report_tool(path: str, html_report_host_address="http://local
 
         # Add optimization suggestions summary
         if optimization_suggestions:
-            priority_counts = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
-            category_counts = {}
-
-            for suggestion in optimization_suggestions:
-                priority = suggestion.get('priority', 'LOW')
-                category = suggestion.get('category', 'OTHER')
-
-                priority_counts[priority] = priority_counts.get(priority, 0) + 1
-                category_counts[category] = category_counts.get(category, 0) + 1
+            priority_counts = Counter(s.get('priority', 'LOW') for s in optimization_suggestions)
+            category_counts = Counter(s.get('category', 'OTHER') for s in optimization_suggestions)
 
             response_data["optimization_summary"] = {
                 "total_suggestions": len(optimization_suggestions),
-                "by_priority": priority_counts,
-                "by_category": category_counts,
+                "by_priority": {"HIGH": 0, "MEDIUM": 0, "LOW": 0, **priority_counts},
+                "by_category": dict(category_counts),
                 "high_priority_suggestions": [s for s in optimization_suggestions if s.get('priority') == 'HIGH']
             }
 
-        logger.info(f"End-to-end report generation completed successfully from {data_source.source_type}: {data_source.path}")
+        # 各阶段结果合并为一条日志
+        logger.info(
+            "End-to-end report generation completed from %s: %s (application=%s, suggestions=%d, report=%s)",
+            data_source.source_type, data_source.path, analysis_result.application_id,
+            len(optimization_suggestions), report_address
+        )
 
         return create_success_response(
             response_data,
             {
-                "generation_timestamp": datetime.now().isoformat(),
+                "generation_timestamp": _iso_now(),
                 "input_path": path,
                 "detected_source_type": data_source.source_type,
                 "processing_summary": {
@@ -375,14 +407,15 @@ async def generate_report_tool(path: str, html_report_host_address="http://local
         )
 
     except Exception as e:
-        logger.error(f"End-to-end report generation failed: {str(e)}")
+        logger.error("End-to-end report generation failed: %s", e)
         return create_error_response(
             "ReportError",
             f"End-to-end report generation failed: {str(e)}"
         )
 
 
-async def get_optimization_suggestions(input_data: GetOptimizationSuggestionsInput) -> Dict[str, Any]:
+async def get_optimization_suggestions(input_data: GetOptimizationSuggestionsInput,
+                                       session_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Get targeted optimization suggestions based on analysis results
 
@@ -391,43 +424,45 @@ async def get_optimization_suggestions(input_data: GetOptimizationSuggestionsInp
 
     Args:
         input_data: Filter configuration for suggestions
+        session_id: MCP session whose analysis result is used
 
     Returns:
         Filtered optimization suggestions with implementation details
     """
-    global _current_analysis
+    analysis = get_session(session_id).analysis
+    if not analysis:
+        return create_error_response(
+            "ConfigurationError",
+            "No analysis result available. Please run analyze_performance first."
+        )
 
-    try:
-        if not _current_analysis:
-            return create_error_response(
-                "ConfigurationError",
-                "No analysis result available. Please run analyze_performance first."
-            )
+    return _optimization_suggestions_response(analysis, input_data)
 
-        logger.info(f"Retrieving optimization suggestions with filters: {input_data.focus_areas or 'all'}")
+
+def _optimization_suggestions_response(analysis: MatureAnalysisResult,
+                                       input_data: GetOptimizationSuggestionsInput) -> Dict[str, Any]:
+    """根据给定的分析结果生成 get_optimization_suggestions 的响应"""
+    try:
+        logger.info("Retrieving optimization suggestions with filters: %s", input_data.focus_areas or 'all')
 
         # Get filtered suggestions
-        suggestions = analyzer.get_optimization_suggestions(
+        suggestions = flatten_optimization_suggestions(
+            analysis.optimization_recommendations,
             focus_areas=input_data.focus_areas,
             priority_filter=input_data.priority_filter
         )
 
         # Group suggestions by category and priority
-        categorized_suggestions = {}
-        priority_counts = {"HIGH": 0, "MEDIUM": 0, "LOW": 0}
-
+        categorized_suggestions = defaultdict(list)
         for suggestion in suggestions:
-            category = suggestion['category']
-            if category not in categorized_suggestions:
-                categorized_suggestions[category] = []
-            categorized_suggestions[category].append(suggestion)
-            priority_counts[suggestion['priority']] += 1
+            categorized_suggestions[suggestion['category']].append(suggestion)
+        priority_counts = Counter(suggestion['priority'] for suggestion in suggestions)
 
         response_data = {
             "suggestions_found": len(suggestions),
             "suggestions": suggestions,
-            "categorized_suggestions": categorized_suggestions,
-            "priority_breakdown": priority_counts
+            "categorized_suggestions": dict(categorized_suggestions),
+            "priority_breakdown": {"HIGH": 0, "MEDIUM": 0, "LOW": 0, **priority_counts}
         }
 
         # Add configuration recommendations summary
@@ -438,7 +473,7 @@ async def get_optimization_suggestions(input_data: GetOptimizationSuggestionsInp
 
             response_data["recommended_spark_config"] = config_params
 
-        logger.info(f"Retrieved {len(suggestions)} optimization suggestions")
+        logger.info("Retrieved %d optimization suggestions", len(suggestions))
 
         return create_success_response(
             response_data,
@@ -447,77 +482,80 @@ async def get_optimization_suggestions(input_data: GetOptimizationSuggestionsInp
                     "focus_areas": input_data.focus_areas,
                     "priority_filter": input_data.priority_filter
                 },
-                "total_available": len(_current_analysis.optimization_recommendations)
+                "total_available": len(analysis.optimization_recommendations)
             }
         )
 
     except Exception as e:
-        logger.error(f"Failed to get optimization suggestions: {str(e)}")
+        logger.error("Failed to get optimization suggestions: %s", e)
         return create_error_response(
             "SuggestionError",
             f"Failed to get optimization suggestions: {str(e)}"
         )
 
 
-async def get_analysis_status_tool() -> Dict[str, Any]:
+async def get_analysis_status_tool(session_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Get current analysis session status and summary information
 
     Returns information about the current analysis session, including
     data source, analysis configuration, and key metrics.
 
+    Args:
+        session_id: MCP session to report on
+
     Returns:
         Current session status and summary
     """
-    global _current_analysis, _current_data_source
+    session = sessions.get(session_id or _DEFAULT_SESSION_ID) or Session()
 
     try:
         status = {
-            "session_active": _current_analysis is not None,
-            "data_source_loaded": _current_data_source is not None,
+            "session_active": session.analysis is not None,
+            "data_source_loaded": session.data_source is not None,
         }
 
-        if _current_data_source:
+        if session.data_source:
             status["data_source"] = {
-                "type": _current_data_source.source_type,
-                "path": _current_data_source.path
+                "type": session.data_source.source_type,
+                "path": session.data_source.path
             }
 
             status["data_info"] = {
-                "source_type": _current_data_source.source_type,
-                "path": _current_data_source.path
+                "source_type": session.data_source.source_type,
+                "path": session.data_source.path
             }
 
-        if _current_analysis:
-            status["analysis_summary"] = analyzer.get_analysis_summary()
-            status["optimization_suggestions_available"] = len(_current_analysis.optimization_recommendations)
+        if session.analysis:
+            status["analysis_summary"] = session.analysis.analysis_summary
+            status["optimization_suggestions_available"] = len(session.analysis.optimization_recommendations)
 
         return create_success_response(status)
 
     except Exception as e:
-        logger.error(f"Failed to get analysis status: {str(e)}")
+        logger.error("Failed to get analysis status: %s", e)
         return create_error_response(
             "StatusError",
             f"Failed to get analysis status: {str(e)}"
         )
 
 
-async def clear_session_tool() -> Dict[str, Any]:
+async def clear_session_tool(session_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Clear current analysis session and cached data
 
     This tool resets the server state, clearing all cached analysis results
     and data sources. Use this to start a fresh analysis session.
 
+    Args:
+        session_id: MCP session to clear
+
     Returns:
         Confirmation of session clearing
     """
-    global _current_analysis, _current_data_source
-
     try:
-        # Clear global state
-        _current_analysis = None
-        _current_data_source = None
+        # Clear this session's state only; other sessions are untouched
+        sessions.pop(session_id or _DEFAULT_SESSION_ID, None)
 
         logger.info("Session cleared successfully")
 
@@ -527,7 +565,7 @@ async def clear_session_tool() -> Dict[str, Any]:
         })
 
     except Exception as e:
-        logger.error(f"Failed to clear session: {str(e)}")
+        logger.error("Failed to clear session: %s", e)
         return create_error_response(
             "ClearError",
             f"Failed to clear session: {str(e)}"
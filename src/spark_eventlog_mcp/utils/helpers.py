@@ -3,63 +3,112 @@ Helper utilities for Spark Event Log Analysis MCP Server
 """
 
 import os
+import re
+import sys
 import json
 import logging
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
 from pathlib import Path
 
+# 详细的日志格式,包含时间、日志级别、文件名、行号、函数名和消息（仅 DEBUG 级别使用）
+_DEBUG_LOG_FORMAT = (
+    '%(asctime)s - %(levelname)-8s - '
+    '[%(filename)s:%(lineno)d:%(funcName)s] - '
+    '%(name)s - %(message)s'
+)
+
+# INFO 及以上级别使用的精简格式,不需要调用位置信息
+_LOG_FORMAT = '%(asctime)s - %(levelname)-8s - %(name)s - %(message)s'
+
+# 时间格式
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Pattern: application_1234567890123_0001
+_APP_ID_RE = re.compile(r'application_\d+_\d+')
+_INVALID_FN_RE = re.compile(r'[<>:"/\\|?*]')
+_MULTI_UNDER_RE = re.compile(r'_{2,}')
+
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# 环境变量中视为 true 的取值（常见写法直接命中，无需 lower()）
+_TRUE_VALUES = frozenset(("true", "1", "yes", "on", "TRUE", "True", "YES", "Yes", "ON", "On"))
+
+# 响应信封使用的键，所有 MCP 工具响应共享同一组字符串对象
+_SUCCESS = sys.intern("success")
+_DATA = sys.intern("data")
+_METADATA = sys.intern("metadata")
+_ERROR = sys.intern("error")
+_TYPE = sys.intern("type")
+_MESSAGE = sys.intern("message")
+_DETAILS = sys.intern("details")
+
 def setup_logging(log_level: str = "INFO") -> logging.Logger:
     """
     Setup logging configuration for the MCP server
 
+    The root handler is installed only once; repeated calls (one per importing
+    module) return the shared logger without touching the configuration.
+
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR)
 
     Returns:
         Configured logger instance
     """
-    # 详细的日志格式,包含时间、日志级别、文件名、行号、函数名和消息
-    log_format = (
-        '%(asctime)s - %(levelname)-8s - '
-        '[%(filename)s:%(lineno)d:%(funcName)s] - '
-        '%(name)s - %(message)s'
-    )
-
-    # 时间格式
-    date_format = '%Y-%m-%d %H:%M:%S'
-
-    logging.basicConfig(
-        level=getattr(logging, log_level.upper()),
-        format=log_format,
-        datefmt=date_format
-    )
-
     logger = logging.getLogger("spark-eventlog-mcp")
+
+    root = logging.getLogger()
+    if root.handlers:
+        return logger
+
+    level = getattr(logging, log_level.upper(), logging.INFO)
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        _DEBUG_LOG_FORMAT if level <= logging.DEBUG else _LOG_FORMAT,
+        _DATE_FORMAT
+    ))
+    root.addHandler(handler)
+    root.setLevel(level)
+
     return logger
 
-def load_config_from_env() -> Dict[str, Any]:
+def _get_bool(key: str, default: bool = False) -> bool:
+    """Read a boolean environment variable"""
+    value = os.getenv(key)
+    if value is None:
+        return default
+    return value in _TRUE_VALUES or value.lower() in _TRUE_VALUES
+
+def _get_int(key: str, default: int) -> int:
+    """Read an integer environment variable, falling back to default on unset or invalid values"""
+    value = os.getenv(key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+@lru_cache(maxsize=1)
+def load_config_from_env() -> Mapping[str, Any]:
     """
     Load configuration from environment variables with optimized parsing
 
+    The environment is read once per process; later calls return the same
+    read-only mapping. Call ``load_config_from_env.cache_clear()`` to reload.
+
     Returns:
-        Configuration dictionary with properly typed values
+        Read-only configuration mapping with properly typed values
     """
-    # Helper function for boolean conversion
-    def get_bool(key: str, default: str = "false") -> bool:
-        return os.getenv(key, default).lower() in ("true", "1", "yes", "on")
-
-    # Helper function for integer conversion with validation
-    def get_int(key: str, default: int) -> int:
-        try:
-            return int(os.getenv(key, str(default)))
-        except (ValueError, TypeError):
-            return default
-
     # Server settings
     server_config = {
         "server_name": os.getenv("MCP_SERVER_NAME", "Spark EventLog Analyzer"),
         "server_version": os.getenv("MCP_SERVER_VERSION", "1.0.0"),
         "log_level": os.getenv("LOG_LEVEL", "INFO").upper(),
+        "log_request_body": _get_bool("LOG_REQUEST_BODY"),
         "mcp_host": os.getenv("MCP_HOST"),
         "mcp_port": os.getenv("MCP_PORT"),
         "html_report_host_address": os.getenv("HTML_REPORT_HOST_ADDRESS","http://localhost:7799"),
@@ -75,8 +124,8 @@ def load_config_from_env() -> Dict[str, Any]:
 
     # Cache settings
     cache_config = {
-        "cache_enabled": get_bool("CACHE_ENABLED", "true"),
-        "cache_ttl": get_int("CACHE_TTL", 300),
+        "cache_enabled": _get_bool("CACHE_ENABLED", True),
+        "cache_ttl": _get_int("CACHE_TTL", 300),
     }
 
     # Analysis settings (暂无实际使用的分析配置)
@@ -87,8 +136,8 @@ def load_config_from_env() -> Dict[str, Any]:
 
     # Performance settings (未实现的功能，保留配置结构)
     performance_config = {
-        "enable_metrics": get_bool("ENABLE_METRICS", "false"),
-        "metrics_port": get_int("METRICS_PORT", 9090),
+        "enable_metrics": _get_bool("ENABLE_METRICS"),
+        "metrics_port": _get_int("METRICS_PORT", 9090),
     }
 
     # Merge all configurations
@@ -100,7 +149,7 @@ def load_config_from_env() -> Dict[str, Any]:
         **performance_config,
     }
 
-    return config
+    return MappingProxyType(config)
 
 def validate_file_path(file_path: str) -> bool:
     """
@@ -128,7 +177,8 @@ def validate_s3_path(s3_path: str) -> bool:
     Returns:
         True if valid format, False otherwise
     """
-    return s3_path.startswith("s3://") and len(s3_path.split("/")) >= 4
+    # "s3://" 之后至少还要有一个 "/" 分隔 bucket 与 key，find 找到即返回且不分配列表
+    return s3_path[:5] == "s3://" and s3_path.find("/", 5) != -1
 
 def validate_url(url: str) -> bool:
     """
@@ -140,7 +190,7 @@ def validate_url(url: str) -> bool:
     Returns:
         True if valid format, False otherwise
     """
-    return url.startswith(("http://", "https://"))
+    return url[:7] == "http://" or url[:8] == "https://"
 
 def format_bytes(bytes_value: int) -> str:
     """
@@ -155,12 +205,13 @@ def format_bytes(bytes_value: int) -> str:
     if bytes_value == 0:
         return "0 B"
 
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if bytes_value < 1024:
-            return f"{bytes_value:.2f} {unit}"
-        bytes_value /= 1024
+    # 小于 1 KB（含负数）直接按字节输出
+    if bytes_value < 1024:
+        return f"{bytes_value:.2f} B"
 
-    return f"{bytes_value:.2f} PB"
+    # 每个单位相差 2^10，由二进制位数直接得到单位下标，只做一次除法
+    idx = min((int(bytes_value).bit_length() - 1) // 10, len(_BYTE_UNITS) - 1)
+    return f"{bytes_value / (1 << (idx * 10)):.2f} {_BYTE_UNITS[idx]}"
 
 def format_duration_ms(duration_ms: int) -> str:
     """
@@ -224,11 +275,7 @@ def extract_application_id_from_path(path: str) -> Optional[str]:
         Application ID if found, None otherwise
     """
     # Common patterns for Spark application IDs
-    import re
-
-    # Pattern: application_1234567890123_0001
-    pattern = r'application_\d+_\d+'
-    match = re.search(pattern, path)
+    match = _APP_ID_RE.search(path)
 
     if match:
         return match.group(0)
@@ -247,18 +294,11 @@ def create_error_response(error_type: str, message: str, details: Optional[Dict[
     Returns:
         Standardized error response dictionary
     """
-    response = {
-        "success": False,
-        "error": {
-            "type": error_type,
-            "message": message
-        }
-    }
-
+    error = {_TYPE: error_type, _MESSAGE: message}
     if details:
-        response["error"]["details"] = details
+        error[_DETAILS] = details
 
-    return response
+    return {_SUCCESS: False, _ERROR: error}
 
 def create_success_response(data: Any, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
@@ -271,13 +311,9 @@ def create_success_response(data: Any, metadata: Optional[Dict[str, Any]] = None
     Returns:
         Standardized success response dictionary
     """
-    response = {
-        "success": True,
-        "data": data
-    }
-
+    response = {_SUCCESS: True, _DATA: data}
     if metadata:
-        response["metadata"] = metadata
+        response[_METADATA] = metadata
 
     return response
 
@@ -291,13 +327,11 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename
     """
-    import re
-
     # Remove or replace invalid characters
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    sanitized = _INVALID_FN_RE.sub('_', filename)
 
     # Remove multiple underscores
-    sanitized = re.sub(r'_{2,}', '_', sanitized)
+    sanitized = _MULTI_UNDER_RE.sub('_', sanitized)
 
     # Remove leading/trailing underscores and dots
     sanitized = sanitized.strip('_.')
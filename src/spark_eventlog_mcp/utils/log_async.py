@@ -0,0 +1,37 @@
+"""
+异步日志处理器模块
+
+日志记录只在调用线程里格式化并放入队列，真正的 stdout 写入由后台线程完成，
+事件循环不会因为终端/管道写阻塞而卡住。
+"""
+
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    基于队列的非阻塞日志处理器
+
+    通过 dictConfig 以 ``"()": "spark_eventlog_mcp.utils.log_async.AsyncQueueHandler"``
+    工厂方式引用（不要用 ``"class"``，否则会进入 dictConfig 对 QueueHandler 的特殊处理）；
+    ``stream`` 参数与 logging.StreamHandler 相同。每个实例拥有一个
+    SimpleQueue 和一个 QueueListener 后台线程，由该线程持有真正的 StreamHandler。
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(SimpleQueue())
+        self._target = logging.StreamHandler(stream)
+        self._listener = QueueListener(self.queue, self._target)
+        self._listener.start()
+        # 退出时先排空队列再关闭，logging.shutdown 也会调用 close，这里保证只停止一次
+        atexit.register(self.close)
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()
+            self._target.close()
+        super().close()
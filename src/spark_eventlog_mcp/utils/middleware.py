@@ -2,86 +2,188 @@
 FastAPI 中间件模块
 """
 
-import time
-from fastapi import Request
-from ..utils.helpers import setup_logging, load_config_from_env
+import logging
+from time import perf_counter
+from typing import Optional
+from ..utils.helpers import load_config_from_env
 
-config = load_config_from_env()
-logger = setup_logging(config["log_level"])
+# 处理器由应用入口 (server.py) 通过 setup_logging 统一配置，这里只取子 logger，记录向上传播
+logger = logging.getLogger("spark-eventlog-mcp.middleware")
 
+# 会携带请求体的方法
+_MUTATING = frozenset({"POST", "PUT", "PATCH"})
 
-async def log_requests_middleware(request: Request, call_next):
+# 健康检查 / 探针等高频路径不做任何记录，直接放行
+_SKIP_PATHS = frozenset({"/health", "/healthz", "/ready", "/metrics", "/favicon.ico"})
+
+# 访问日志的固定格式串（按请求合并成一条记录），字段以 extra= 形式同时附加在日志记录上
+_REQUEST_STARTED_FORMAT = (
+    "Request started - %(http_method)s %(http_path)s | Client: %(client)s | User-Agent: %(user_agent)s | "
+    "Content-Type: %(content_type)s | Accept: %(accept)s | Content-Length: %(content_length)s"
+)
+_REQUEST_COMPLETED_FORMAT = "Request completed - Status: %(status_code)d | Duration: %(duration_ms).1fms"
+
+# 请求体日志最多记录的字节数
+_BODY_PREVIEW_BYTES = 1000
+
+# 自定义响应头名称（ASGI 原始响应头为小写 bytes，直接追加无需再规范化）
+_X_PROCESS_TIME = b"x-process-time"
+
+# 需要读取的请求头（ASGI 原始请求头名称均为小写 bytes）
+_LOGGED_HEADERS = frozenset({b"user-agent", b"content-type", b"accept", b"content-length", b"transfer-encoding"})
+
+
+async def _capture_body(receive):
+    """
+    从 ASGI receive 读取完整请求体
+
+    Returns:
+        (请求体字节, 新的 receive)：新的 receive 先原样重放请求体，之后交回原始 receive
+        （下游仍能收到真实的 http.disconnect，流式响应不会被误判为客户端断开）
+    """
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    body_sent = False
+
+    async def replay():
+        nonlocal body_sent
+        if body_sent:
+            return await receive()
+        body_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return body, replay
+
+
+class LoggingMiddleware:
     """
     记录所有HTTP请求的详细信息，包括请求头和请求体
+
+    纯 ASGI 中间件：直接包装 send 获取状态码和耗时，不经过 BaseHTTPMiddleware 的
+    call_next（每个请求一个任务组 + 内存队列转发响应体）。
+
+    请求体日志需要先把整个请求体读入内存再重放给下游，默认关闭；由应用注册中间件时通过
+    ``log_request_body`` 传入，未传入时在创建中间件时读取 LOG_REQUEST_BODY 配置（导入模块时不读取环境）。
     """
-    start_time = time.time()
-
-    # 记录请求开始信息
-    client_host = request.client.host if request.client else "unknown"
-    user_agent = request.headers.get("user-agent", "unknown")
-    content_type = request.headers.get("content-type", "none")
-    accept = request.headers.get("accept", "none")
-    content_length = request.headers.get("content-length", "0")
-
-    # 记录关键请求头信息
-    logger.info(f"Request started - {request.method} {request.url.path}")
-    logger.info(f"Client: {client_host} | User-Agent: {user_agent}")
-    logger.info(f"Content-Type: {content_type} | Accept: {accept} | Content-Length: {content_length}")
-
-    # 读取请求体（如果有）
-    request_body = None
-    if request.method in ["POST", "PUT", "PATCH"]:
-        try:
-            body_bytes = await request.body()
-            if body_bytes:
-                request_body = body_bytes.decode('utf-8')
-                # 限制请求体日志长度，避免过长
-                if len(request_body) > 1000:
-                    logger.info(f"Request body (truncated): {request_body[:1000]}...")
+
+    def __init__(self, app, log_request_body: Optional[bool] = None):
+        self.app = app
+        if log_request_body is None:
+            log_request_body = load_config_from_env().get("log_request_body", False)
+        self.log_request_body = log_request_body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in _SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = perf_counter()
+        # 日志级别在入口处各判断一次；级别关闭时跳过所有格式化和字典构建
+        info_on = logger.isEnabledFor(logging.INFO)
+        debug_on = logger.isEnabledFor(logging.DEBUG)
+
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
+        client_host = client[0] if client else "unknown"
+
+        # 同一请求的所有 INFO 信息在请求结束时合并为一条记录，每个请求只获取一次处理器锁；
+        # 字段字典既作为格式化参数，也通过 extra 挂到 LogRecord 上，结构化（JSON）处理器可直接取字段
+        log_formats = []
+        log_fields = {}
+
+        # 记录关键请求头信息：一次遍历原始请求头，只取需要的几项，仅在记录时解码
+        capture_body = False
+        if info_on:
+            headers = {}
+            for name, value in scope["headers"]:
+                if name in _LOGGED_HEADERS:
+                    headers[name] = value
+            log_formats.append(_REQUEST_STARTED_FORMAT)
+            log_fields.update(
+                http_method=method,
+                http_path=path,
+                client=client_host,
+                user_agent=headers.get(b"user-agent", b"unknown").decode("latin-1"),
+                content_type=headers.get(b"content-type", b"none").decode("latin-1"),
+                accept=headers.get(b"accept", b"none").decode("latin-1"),
+                content_length=headers.get(b"content-length", b"0").decode("latin-1"),
+            )
+
+            if self.log_request_body and method in _MUTATING:
+                # 文件上传（multipart）和分块传输的请求体可能很大，不整体缓冲到内存，直接流向下游
+                if (headers.get(b"content-type", b"").startswith(b"multipart/")
+                        or b"chunked" in headers.get(b"transfer-encoding", b"")):
+                    log_formats.append("Request body: (streamed upload, not captured)")
                 else:
-                    logger.info(f"Request body: {request_body}")
-            else:
-                logger.info("Request body: (empty)")
-        except Exception as e:
-            logger.warning(f"Failed to read request body: {e}")
-
-    # 记录所有请求头（可选，用于调试）
-    if logger.level <= 10:  # DEBUG level
-        logger.debug("All request headers:")
-        for name, value in request.headers.items():
-            logger.debug(f"  {name}: {value}")
-
-    # 记录查询参数（如果有）
-    if request.query_params:
-        logger.info(f"Query params: {dict(request.query_params)}")
-
-    # 重新构造请求对象，因为 body() 只能读取一次
-    async def receive():
-        return {"type": "http.request", "body": request_body.encode('utf-8') if request_body else b""}
-
-    if request_body is not None:
-        # 创建新的 scope，保持请求体可用
-        scope = request.scope.copy()
-        new_request = Request(scope, receive=receive)
-        # 复制原始请求的属性
-        for attr in ['method', 'url', 'headers', 'query_params', 'path_params']:
-            setattr(new_request, f'_{attr}', getattr(request, f'_{attr}', getattr(request, attr, None)))
-        request = new_request
-
-    # 执行请求
-    response = await call_next(request)
-
-    # 计算处理时间
-    process_time = time.time() - start_time
-
-    # 记录响应信息
-    logger.info(f"Request completed - Status: {response.status_code} | Duration: {process_time:.3f}s")
-
-    # 如果是错误状态码，记录更多信息
-    if response.status_code >= 400:
-        logger.warning(f"HTTP Error {response.status_code} - {request.method} {request.url.path} from {client_host}")
-
-    # 添加自定义响应头（可选）
-    response.headers["X-Process-Time"] = str(process_time)
-
-    return response
\ No newline at end of file
+                    capture_body = True
+
+        # 读取请求体（仅在开启请求体日志时；否则不缓冲，请求体直接流向下游）
+        if capture_body:
+            try:
+                body_bytes, receive = await _capture_body(receive)
+                if body_bytes:
+                    # 限制请求体日志长度：先按字节截取再解码，大请求体也只解码前 1000 字节
+                    log_fields["request_body"] = body_bytes[:_BODY_PREVIEW_BYTES].decode('utf-8', errors='replace')
+                    if len(body_bytes) > _BODY_PREVIEW_BYTES:
+                        log_fields["request_body_bytes"] = len(body_bytes)
+                        log_formats.append("Request body (truncated, %(request_body_bytes)d bytes): %(request_body)s...")
+                    else:
+                        log_formats.append("Request body: %(request_body)s")
+                else:
+                    log_formats.append("Request body: (empty)")
+            except Exception as e:
+                logger.warning("Failed to read request body: %s", e)
+
+        # 记录所有请求头（可选，用于调试），同样合并为一条记录
+        if debug_on:
+            logger.debug(
+                "All request headers:\n%s",
+                "\n".join(f"  {name.decode('latin-1')}: {value.decode('latin-1')}" for name, value in scope["headers"])
+            )
+
+        # 记录查询参数（如果有）：直接记录原始查询串，不解析成字典
+        if info_on and scope["query_string"]:
+            log_fields["query_string"] = scope["query_string"].decode("latin-1")
+            log_formats.append("Query params: %(query_string)s")
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # 添加自定义响应头（可选）：响应头发出时的处理耗时，直接追加到原始响应头列表
+                process_time = perf_counter() - start_time
+                header = (_X_PROCESS_TIME, f"{process_time * 1000:.1f}ms".encode("ascii"))
+                raw_headers = message.get("headers")
+                if isinstance(raw_headers, list):
+                    raw_headers.append(header)
+                else:
+                    message["headers"] = [*(raw_headers or ()), header]
+            await send(message)
+
+        try:
+            # 执行请求
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 计算处理时间（包含响应体发送完成）；下游抛出异常时同样输出已收集的请求信息
+            process_time = perf_counter() - start_time
+
+            # 记录响应信息
+            if info_on:
+                log_fields["status_code"] = status_code
+                log_fields["duration_ms"] = process_time * 1000
+                log_formats.append(_REQUEST_COMPLETED_FORMAT)
+                logger.info("\n".join(log_formats), log_fields, extra=log_fields)
+
+            # 如果是错误状态码，记录更多信息
+            if status_code >= 400:
+                logger.warning("HTTP Error %d - %s %s from %s", status_code, method, path, client_host)
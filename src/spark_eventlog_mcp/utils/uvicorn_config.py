@@ -2,42 +2,56 @@
 Uvicorn 日志配置模块
 """
 
+from functools import lru_cache
 
+# 与日志级别无关的部分，模块加载时构建一次，所有级别的配置共享（只读）
+_FORMATTERS = {
+    "default": {
+        "format": "%(asctime)s - %(levelname)-8s - [%(name)s:%(lineno)d:%(funcName)s] - uvicorn - %(message)s",
+        "datefmt": "%Y-%m-%d %H:%M:%S",
+    },
+    "access": {
+        "format": "%(asctime)s - %(levelname)-8s - [uvicorn.access] - %(message)s",
+        "datefmt": "%Y-%m-%d %H:%M:%S",
+    },
+}
+
+# 处理器通过 "()" 工厂创建而不是 "class"：dictConfig 对 class 为 QueueHandler 子类的配置有专门处理
+# （3.12 要求 handlers 列表，3.13 会改用 strm 参数重试），工厂方式不触发该分支，3.12+ 行为一致
+_HANDLERS = {
+    "default": {
+        "formatter": "default",
+        "()": "spark_eventlog_mcp.utils.log_async.AsyncQueueHandler",
+        "stream": "ext://sys.stdout",
+    },
+    "access": {
+        "formatter": "access",
+        "()": "spark_eventlog_mcp.utils.log_async.AsyncQueueHandler",
+        "stream": "ext://sys.stdout",
+    },
+}
+
+
+@lru_cache(maxsize=8)
 def get_uvicorn_log_config(log_level: str) -> dict:
     """
     获取 uvicorn 的日志配置
 
+    同一日志级别的配置只构建一次，之后返回同一个字典对象，调用方不要修改它。
+    （uvicorn 要求传入 dict，因此不能返回只读映射；dictConfig 只读取不修改。）
+
     Args:
         log_level: 日志级别 (DEBUG, INFO, WARNING, ERROR)
 
     Returns:
-        uvicorn 日志配置字典
+        uvicorn 日志配置字典（共享实例，只读使用）
     """
     return {
         "version": 1,
         "disable_existing_loggers": False,
-        "formatters": {
-            "default": {
-                "format": "%(asctime)s - %(levelname)-8s - [%(name)s:%(lineno)d:%(funcName)s] - uvicorn - %(message)s",
-                "datefmt": "%Y-%m-%d %H:%M:%S",
-            },
-            "access": {
-                "format": "%(asctime)s - %(levelname)-8s - [uvicorn.access] - %(message)s",
-                "datefmt": "%Y-%m-%d %H:%M:%S",
-            },
-        },
-        "handlers": {
-            "default": {
-                "formatter": "default",
-                "class": "logging.StreamHandler",
-                "stream": "ext://sys.stdout",
-            },
-            "access": {
-                "formatter": "access",
-                "class": "logging.StreamHandler",
-                "stream": "ext://sys.stdout",
-            },
-        },
+        "formatters": _FORMATTERS,
+        "handlers": _HANDLERS,
+        # 只有 loggers 部分依赖日志级别
         "loggers": {
             "uvicorn": {
                 "handlers": ["default"],
@@ -55,4 +69,4 @@ def get_uvicorn_log_config(log_level: str) -> dict:
                 "propagate": False
             },
         },
-    }
\ No newline at end of file
+    }
@@ -9,8 +9,10 @@ providing both MCP tools and RESTful API endpoints.
 import sys
 import os
 
-# Add the src directory to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+# Add the src directory to the Python path (once, even if this module is imported repeatedly)
+src_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
 
 from spark_eventlog_mcp.server import main
 
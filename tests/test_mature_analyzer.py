@@ -0,0 +1,43 @@
+import asyncio
+import json
+
+from spark_eventlog_mcp.tools.mature_analyzer import MatureSparkEventLogAnalyzer
+
+
+def _event(**fields) -> bytes:
+    return json.dumps(fields).encode("utf-8")
+
+
+async def _aiter(lines):
+    for line in lines:
+        yield line
+
+
+def _analyze(lines):
+    return asyncio.run(MatureSparkEventLogAnalyzer().analyze_stream(_aiter(lines)))
+
+
+def test_invalid_utf8_line_does_not_abort_analysis():
+    lines = [
+        _event(**{"Event": "SparkListenerLogStart", "Spark Version": "3.5.0"}),
+        b'{"Event": "SparkListenerUnknown", "Bad": "\xff"}',
+        _event(**{"Event": "SparkListenerApplicationStart", "App ID": "app-1",
+                  "App Name": "demo", "Timestamp": 1000, "User": "spark"}),
+    ]
+
+    result = _analyze(lines)
+
+    assert result.application_id == "app-1"
+    assert result.spark_version == "3.5.0"
+
+
+def test_invalid_utf8_bytes_are_ignored_within_a_line():
+    lines = [
+        b'{"Event": "SparkListenerApplicationStart", "App ID": "app-1", '
+        b'"App Name": "demo\xff", "Timestamp": 1000, "User": "spark"}',
+    ]
+
+    result = _analyze(lines)
+
+    assert result.application_id == "app-1"
+    assert result.application_name == "demo"